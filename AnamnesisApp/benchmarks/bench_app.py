@@ -0,0 +1,170 @@
+"""בנצ'מרק לאפליקציה: ייבוא קר, בניית תוכן, זמן rerun ומספר deltas לכל תלונה.
+
+    python benchmarks/bench_app.py --out bench.json
+    python benchmarks/bench_app.py --out new.json --baseline bench.json --threshold 0.2
+
+רץ בתוך התהליך עם AppTest של Streamlit (בלי דפדפן ובלי רשת).
+עם --baseline: כל מדד שגדל ביותר מ-threshold (יחסי) מכשיל את הריצה (exit 1).
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Callable
+from statistics import median
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+REPO_DIR = os.path.dirname(APP_DIR)
+sys.path.insert(0, APP_DIR)
+
+SELECT_LABEL = "בחר תלונה"
+
+
+def _ms(fn: Callable[[], Any], repeat: int) -> float:
+    """חציון זמן ריצה במילישניות."""
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t) * 1000)
+    return round(median(times), 3)
+
+
+def _count_nodes(node: Any) -> int:
+    # כל element/block בעץ = delta אחד שנשלח ללקוח
+    return sum(1 + _count_nodes(ch) for ch in getattr(node, "children", {}).values())
+
+
+# ========================= מדדים =========================
+def bench_cold_import(repeat: int) -> float:
+    """ריצה ראשונה של app.py בתהליך חדש (כולל import של streamlit והמודולים)."""
+    code = ("import sys,time;t=time.perf_counter();sys.path.insert(0,%r);"
+            "from streamlit.testing.v1 import AppTest;AppTest.from_file(%r).run(timeout=60);"
+            "print((time.perf_counter()-t)*1000)") % (APP_DIR, APP_PATH)
+    times = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], cwd=REPO_DIR, capture_output=True,
+                             text=True, check=True).stdout
+        times.append(float(out.strip().splitlines()[-1]))
+    return round(median(times), 3)
+
+
+def bench_content(repeat: int) -> Dict[str, float]:
+    import knowledge
+    from build_knowledge import compile_pack
+    with open(knowledge.KNOWLEDGE_PATH, "rb") as f:
+        raw_k = f.read()
+    with open(knowledge.VIDEO_LINKS_PATH, "rb") as f:
+        raw_v = f.read()
+    version = knowledge.content_version(raw_k, raw_v)
+
+    def attach() -> None:
+        complaints, video_map = json.loads(raw_k), json.loads(raw_v)
+        t = time.perf_counter()
+        index = knowledge.get_video_index(video_map)       # כמו knowledge._build: אינדקס אחד לכל הבלוקים
+        for blk in complaints.values():
+            knowledge.attach_video_links(blk, index)
+        attach_times.append((time.perf_counter() - t) * 1000)
+
+    attach_times: List[float] = []
+    pack = compile_pack(json.loads(raw_k), json.loads(raw_v), version)
+    res = {
+        "content_build_json_ms": _ms(lambda: knowledge._build(raw_k, raw_v, version), repeat),
+        "content_load_pack_ms": _ms(lambda: knowledge.load_pack(pack), repeat),
+    }
+    for _ in range(repeat):
+        attach()
+    res["attach_video_links_ms"] = round(median(attach_times), 3)
+    return res
+
+
+def bench_reruns(repeat: int) -> Dict[str, Any]:
+    from streamlit.testing.v1 import AppTest
+    import knowledge
+    names = knowledge.get_content().names
+    at = AppTest.from_file(APP_PATH, default_timeout=30).run()
+    per: Dict[str, Dict[str, float]] = {}
+    for name in names:
+        times = []
+        for _ in range(repeat):
+            t = time.perf_counter()
+            next(s for s in at.selectbox if s.label == SELECT_LABEL).select(name).run()
+            times.append((time.perf_counter() - t) * 1000)
+            if at.exception:
+                raise RuntimeError(f"{name}: {at.exception[0].message}")
+        per[name] = {"rerun_ms": round(median(times), 3), "deltas": _count_nodes(at._tree)}
+    all_ms = sorted(v["rerun_ms"] for v in per.values())
+    return {
+        "rerun_median_ms": round(median(all_ms), 3),
+        "rerun_max_ms": all_ms[-1],
+        "deltas_max": max(v["deltas"] for v in per.values()),
+        "per_complaint": per,
+    }
+
+
+# ========================= השוואה =========================
+def compare(new: Dict[str, Any], old: Dict[str, Any], threshold: float) -> List[str]:
+    """מדדים (מספריים, ברמה העליונה) שגדלו ביותר מ-threshold ביחס ל-baseline."""
+    bad = []
+    for key, value in new["results"].items():
+        prev = old.get("results", {}).get(key)
+        if isinstance(value, (int, float)) and isinstance(prev, (int, float)) and prev > 0:
+            if value > prev * (1 + threshold):
+                bad.append(f"{key}: {prev} -> {value} (+{(value / prev - 1) * 100:.0f}%)")
+    return bad
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="בנצ'מרק ל-app.py")
+    ap.add_argument("--out", default="bench.json")
+    ap.add_argument("--baseline", help="קובץ תוצאות קודם להשוואה")
+    ap.add_argument("--threshold", type=float, default=0.2, help="רגרסיה יחסית מותרת (0.2 = 20%%)")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--cold-repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+    out = os.path.abspath(args.out)
+    baseline = os.path.abspath(args.baseline) if args.baseline else None
+    # כמו ב-devcontainer: הרצה משורש הריפו (קונפיג Streamlit נקרא מתיקיית העבודה)
+    os.chdir(REPO_DIR)
+
+    results: Dict[str, Any] = {"cold_import_ms": bench_cold_import(args.cold_repeat)}
+    results.update(bench_content(args.repeat))
+    reruns = bench_reruns(args.repeat)
+    per_complaint = reruns.pop("per_complaint")
+    results.update(reruns)
+    report = {
+        "meta": {"commit": _git_rev(), "python": platform.python_version(),
+                 "platform": platform.platform(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": results,
+        "per_complaint": per_complaint,
+    }
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    for key, value in results.items():
+        print(f"{key:28} {value}")
+
+    if baseline:
+        with open(baseline, encoding="utf-8") as f:
+            bad = compare(report, json.load(f), args.threshold)
+        for line in bad:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if bad:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
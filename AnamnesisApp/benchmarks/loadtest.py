@@ -0,0 +1,267 @@
+"""בדיקת עומס: N סשנים מקבילים מול שרת Streamlit מקומי דרך פרוטוקול ה-websocket.
+
+    python benchmarks/loadtest.py --sessions 50 --duration 60 --rate 0.5
+    python benchmarks/loadtest.py --url http://localhost:8501 --pid 1234 ...
+
+כל סשן מתחבר ל-/_stcore/stream כמו דפדפן, בוחר תלונה אקראית בקצב --rate
+(בחירות לשנייה, פואסוני) ומריץ גם את ה-keepalive (rerun של ה-fragment) כל
+--keepalive שניות. מדווח throughput, p50/p95/p99 לזמן rerun ו-RSS של השרת
+לכל סשן. עובד לגמרי offline מול localhost.
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Optional
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from tornado.websocket import websocket_connect
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+REPO_DIR = os.path.dirname(APP_DIR)
+
+SELECT_LABEL = "בחר תלונה"
+READ_TIMEOUT = 60
+
+
+# ========================= שרת =========================
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port: int) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "streamlit", "run", APP_PATH,
+           "--server.headless", "true", "--server.port", str(port), "--server.address", "127.0.0.1",
+           "--browser.gatherUsageStats", "false", "--server.fileWatcherType", "none",
+           # בלי מטמון הודעות: כל delta מגיע במלואו ב-websocket (כמו בחיבור ראשון)
+           "--global.minCachedMessageSize", str(2 ** 31)]
+    return subprocess.Popen(cmd, cwd=REPO_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_healthy(url: str, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/_stcore/health", timeout=2) as r:
+                if r.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"השרת לא עלה: {url}")
+
+
+def rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import psutil  # לא חובה; מאפשר מדידה גם מחוץ ל-Linux
+        return psutil.Process(pid).memory_info().rss // 1024
+    except Exception:
+        return None
+
+
+# ========================= סשן =========================
+class Session:
+    """לקוח websocket מינימלי: שולח rerun_script ומחכה ל-script_finished."""
+
+    def __init__(self, url: str) -> None:
+        self.url = url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.conn: Any = None
+        self.select_id = ""
+        self.options: List[str] = []
+        self.fragment_id = ""
+
+    async def connect(self) -> None:
+        self.conn = await websocket_connect(self.url, subprotocols=["streamlit"])
+
+    async def _send(self, msg: BackMsg) -> None:
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+
+    async def _until_finished(self) -> int:
+        deltas = 0
+        while True:
+            raw = await asyncio.wait_for(self.conn.read_message(), READ_TIMEOUT)
+            if raw is None:
+                raise ConnectionError("websocket נסגר")
+            fwd = ForwardMsg()
+            fwd.ParseFromString(raw)
+            kind = fwd.WhichOneof("type")
+            if kind == "delta":
+                deltas += 1
+                el = fwd.delta.new_element
+                if el.WhichOneof("type") == "selectbox" and el.selectbox.label == SELECT_LABEL:
+                    self.select_id, self.options = el.selectbox.id, list(el.selectbox.options)
+            elif kind == "auto_rerun":
+                self.fragment_id = fwd.auto_rerun.fragment_id
+            elif kind == "script_finished":
+                return deltas
+
+    async def rerun(self, option: Optional[int] = None, keepalive: bool = False) -> float:
+        msg = BackMsg()
+        cs = msg.rerun_script
+        cs.SetInParent()
+        if keepalive:
+            cs.fragment_id, cs.is_auto_rerun = self.fragment_id, True
+        if option is not None and self.select_id:
+            ws = cs.widget_states.widgets.add()
+            ws.id, ws.int_value = self.select_id, option
+        t = time.perf_counter()
+        await self._send(msg)
+        await self._until_finished()
+        return (time.perf_counter() - t) * 1000
+
+    def close(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+
+
+async def run_session(url: str, stop_at: float, rate: float, keepalive_s: float,
+                      select_ms: List[float], keepalive_ms: List[float], errors: List[str]) -> None:
+    s = Session(url)
+    try:
+        await s.connect()
+        await s.rerun()
+        next_keepalive = time.time() + keepalive_s
+        while True:
+            wait = random.expovariate(rate) if rate > 0 else keepalive_s
+            now = time.time()
+            if min(now + wait, next_keepalive) >= stop_at:
+                break
+            if next_keepalive <= now + wait:
+                await asyncio.sleep(max(0.0, next_keepalive - now))
+                if s.fragment_id:
+                    keepalive_ms.append(await s.rerun(keepalive=True))
+                else:
+                    keepalive_ms.append(await s.rerun())   # בלי fragment: rerun מלא (autorefresh)
+                next_keepalive += keepalive_s
+            else:
+                await asyncio.sleep(wait)
+                if len(s.options) > 1:
+                    select_ms.append(await s.rerun(option=random.randrange(1, len(s.options))))
+    except Exception as e:       # סשן שנפל נספר, לא מפיל את כל הריצה
+        errors.append(f"{type(e).__name__}: {e}")
+    finally:
+        s.close()
+
+
+# ========================= דו"ח =========================
+def percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    v = sorted(values)
+    return round(v[min(len(v) - 1, max(0, int(round(p / 100 * len(v))) - 1))], 2)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {"count": len(values), "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95), "p99_ms": percentile(values, 99)}
+
+
+async def run(args: argparse.Namespace, url: str, pid: Optional[int]) -> Dict[str, Any]:
+    select_ms: List[float] = []
+    keepalive_ms: List[float] = []
+    errors: List[str] = []
+    rss_idle = rss_kb(pid) if pid else None
+    rss_peak = rss_idle or 0
+
+    async def sample_rss() -> None:
+        nonlocal rss_peak
+        while True:
+            rss_peak = max(rss_peak, rss_kb(pid) or 0)
+            await asyncio.sleep(0.5)
+
+    sampler = asyncio.create_task(sample_rss()) if pid else None
+    start = time.time()
+    stop_at = start + args.duration
+    tasks = []
+    for _ in range(args.sessions):
+        tasks.append(asyncio.create_task(run_session(
+            url, stop_at, args.rate, args.keepalive, select_ms, keepalive_ms, errors)))
+        await asyncio.sleep(args.ramp / max(1, args.sessions))
+    await asyncio.gather(*tasks)
+    elapsed = time.time() - start
+    if sampler:
+        sampler.cancel()
+
+    report: Dict[str, Any] = {
+        "sessions": args.sessions, "duration_s": round(elapsed, 1), "rate_per_session": args.rate,
+        "throughput_reruns_s": round((len(select_ms) + len(keepalive_ms)) / elapsed, 2),
+        "select": summarize(select_ms), "keepalive": summarize(keepalive_ms),
+        "errors": len(errors), "error_samples": errors[:5],
+    }
+    if pid and rss_idle:
+        report["rss_idle_mb"] = round(rss_idle / 1024, 1)
+        report["rss_peak_mb"] = round(rss_peak / 1024, 1)
+        report["rss_per_session_kb"] = round((rss_peak - rss_idle) / max(1, args.sessions), 1)
+    return report
+
+
+async def _warmup(url: str) -> float:
+    s = Session(url)
+    await s.connect()
+    try:
+        t = await s.rerun()
+        if len(s.options) > 1:
+            t = await s.rerun(option=1)
+        return t
+    finally:
+        s.close()
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="בדיקת עומס לסשנים מקבילים")
+    ap.add_argument("--sessions", type=int, default=20)
+    ap.add_argument("--duration", type=float, default=30, help="שניות")
+    ap.add_argument("--rate", type=float, default=0.5, help="בחירות תלונה לשנייה לכל סשן")
+    ap.add_argument("--keepalive", type=float, default=300, help="מרווח keepalive בשניות (באפליקציה: 300)")
+    ap.add_argument("--ramp", type=float, default=5, help="שניות לפריסת החיבורים")
+    ap.add_argument("--url", help="שרת קיים (ברירת מחדל: מפעיל שרת מקומי)")
+    ap.add_argument("--pid", type=int, help="PID של שרת קיים למדידת RSS")
+    ap.add_argument("--out", help="כתיבת הדו\"ח כ-JSON")
+    args = ap.parse_args(argv)
+
+    proc = None
+    if args.url:
+        url, pid = args.url.rstrip("/"), args.pid
+    else:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        proc = start_server(port)
+        pid = proc.pid
+    try:
+        wait_healthy(url)
+        warm = asyncio.run(_warmup(url))        # טעינת התוכן/מודולים לפני מדידת RSS בסיס
+        report = asyncio.run(run(args, url, pid))
+        report["warmup_ms"] = round(warm, 1)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
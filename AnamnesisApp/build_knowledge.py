@@ -0,0 +1,255 @@
+"""קומפיילר לחבילת התוכן: knowledge.json + video_links.json -> knowledge.pack
+
+    python build_knowledge.py [--strict] [--out knowledge.pack]
+
+בודק שגיאות שמילון פייתון/JSON מסתיר (מפתח כפול כמו "labs" פעמיים באותה תלונה,
+שדות לא מוכרים, טיפוסים שגויים) ו-labels של בדיקה גופנית ללא קישור וידאו.
+הפלט: קובץ בינארי עם כותרת (גרסת פורמט + checksum), קישורים כבר מוצמדים
+ומחרוזות/פריטים זהים משותפים - נטען ב-marshal במילישניות (ראה knowledge.load_pack).
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Tuple
+import argparse
+import hashlib
+import json
+import marshal
+import os
+import sys
+
+from knowledge import (KNOWLEDGE_PATH, VIDEO_LINKS_PATH, PACK_PATH, PACK_MAGIC, PACK_FORMAT,
+                       PY_MAGIC, attach_video_links, content_version)
+from records import ITEM_TYPES, Pool, as_row
+from textnorm import normalize
+from video_index import SEARCH, VideoIndex, get_index as get_video_index
+
+# ========================= סכמה =========================
+BLOCK_FIELDS = {"aliases", "questions", "physical_exam", "labs", "imaging", "scores", "notes", "rules"}
+ITEM_FIELDS: Dict[str, Tuple[str, set]] = {
+    # שדה -> (מפתח חובה, מפתחות מותרים)
+    "physical_exam": ("label", {"label", "url"}),
+    "labs": ("test", {"test", "why", "when"}),
+    "imaging": ("modality", {"modality", "trigger"}),
+    "scores": ("name", {"name", "about", "rule_in", "rule_out", "ref"}),
+}
+TEXT_LISTS = {"aliases", "questions", "notes"}
+RULE_OPS = {"is", ">=", ">", "<=", "<"}
+
+
+class _Obj(dict):
+    """dict שזוכר מפתחות כפולים (JSON מתיר אותם, והאחרון דורס בשקט)."""
+    __slots__ = ("dups",)
+
+
+def _pairs(pairs: List[Tuple[str, Any]]) -> _Obj:
+    o = _Obj()
+    o.dups = []
+    for k, v in pairs:
+        if k in o:
+            o.dups.append(k)
+        o[k] = v
+    return o
+
+
+def _dups(obj: Any) -> List[str]:
+    return getattr(obj, "dups", [])
+
+
+def _load_strict(raw: bytes, path: str, errors: List[str]) -> Any:
+    try:
+        return json.loads(raw, object_pairs_hook=_pairs)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        where = f"{path}:{e.lineno}:{e.colno}" if isinstance(e, json.JSONDecodeError) else path
+        errors.append(f"{where}: JSON לא תקין - {e}")
+        return None
+
+
+# ========================= בדיקות =========================
+def _validate_item(it: Any, field: str, at: str, errors: List[str]) -> None:
+    key, allowed = ITEM_FIELDS[field]
+    if not isinstance(it, dict):
+        errors.append(f"{at} חייב להיות אובייקט עם {key!r}"); return
+    for k in _dups(it):
+        errors.append(f"{at} מפתח כפול {k!r}")
+    for k in it.keys() - allowed:
+        errors.append(f"{at} שדה לא מוכר {k!r}")
+    if not isinstance(it.get(key), str) or not it[key].strip():
+        errors.append(f"{at} חסר {key!r}")
+    for k, v in it.items():
+        if not isinstance(v, str):
+            errors.append(f"{at}.{k} חייב להיות טקסט")
+
+
+def _validate_rules(rules: List[Any], blk: Dict[str, Any], where: str, errors: List[str]) -> None:
+    """כללים (rules.py): כל "q" חייב להיות שאלה של התלונה; שאלה היא כן/לא או מספר, לא שניהם."""
+    questions = {normalize(q) for q in blk.get("questions", []) if isinstance(q, str)}
+    kinds: Dict[str, str] = {}
+    for i, r in enumerate(rules):
+        at = f"{where}.rules[{i}]"
+        if not isinstance(r, dict):
+            errors.append(f"{at} חייב להיות אובייקט"); continue
+        for k in r.keys() - {"when", "add", "remove"}:
+            errors.append(f"{at} שדה לא מוכר {k!r}")
+        when = r.get("when")
+        conds = [when] if isinstance(when, dict) else when
+        if not isinstance(conds, list) or not conds:
+            errors.append(f"{at}.when חסר (תנאי או רשימת תנאים)"); conds = []
+        for c in conds:
+            if not isinstance(c, dict) or not isinstance(c.get("q"), str):
+                errors.append(f"{at}.when תנאי חייב להיות אובייקט עם 'q'"); continue
+            ops = c.keys() - {"q"}
+            if len(ops) != 1 or not ops <= RULE_OPS:
+                errors.append(f"{at}.when {c['q']!r}: אופרטור אחד מתוך {sorted(RULE_OPS)}"); continue
+            op = ops.pop()
+            if op == "is" and c[op] not in ("yes", "no"):
+                errors.append(f"{at}.when {c['q']!r}: is חייב להיות 'yes' או 'no'")
+            if op != "is" and (isinstance(c[op], bool) or not isinstance(c[op], (int, float))):
+                errors.append(f"{at}.when {c['q']!r}: {op} חייב להיות מספר")
+            q = normalize(c["q"])
+            if q not in questions:
+                errors.append(f"{at}.when שאלה לא קיימת בתלונה: {c['q']!r}")
+            kind = "yesno" if op == "is" else "value"
+            if kinds.setdefault(q, kind) != kind:
+                errors.append(f"{at}.when {c['q']!r}: אותה שאלה גם כן/לא וגם מספר")
+        if not r.get("add") and not r.get("remove"):
+            errors.append(f"{at} חסר add או remove")
+        for action in ("add", "remove"):
+            spec = r.get(action, {})
+            if not isinstance(spec, dict):
+                errors.append(f"{at}.{action} חייב להיות אובייקט {{שדה: [...]}}"); continue
+            for field, items in spec.items():
+                if field not in ITEM_TYPES or not isinstance(items, list):
+                    errors.append(f"{at}.{action}.{field}: שדה לא מוכר או לא רשימה"); continue
+                for j, it in enumerate(items):
+                    if action == "add":
+                        _validate_item(it, field, f"{at}.add.{field}[{j}]", errors)
+                    elif not isinstance(it, str) or not it.strip():
+                        errors.append(f"{at}.remove.{field}[{j}] חייב להיות שם פריט")
+
+
+def validate(complaints: Any, video_map: Any) -> Tuple[List[str], List[str]]:
+    """מחזיר (errors, warnings)."""
+    errors: List[str] = []
+    warnings: List[str] = []
+    if not isinstance(complaints, dict):
+        return ["knowledge.json: השורש חייב להיות אובייקט {שם תלונה: בלוק}"], warnings
+    for k in _dups(complaints):
+        errors.append(f"knowledge.json: תלונה כפולה {k!r} (השנייה דורסת את הראשונה)")
+    for k in _dups(video_map):
+        errors.append(f"video_links.json: label כפול {k!r}")
+    if not isinstance(video_map, dict) or not all(
+            isinstance(v, list) and all(isinstance(u, str) for u in v) for v in video_map.values()):
+        errors.append("video_links.json: מבנה צפוי {label: [url, ...]}")
+        video_map = {}
+    videos = VideoIndex(video_map)
+
+    for name, blk in complaints.items():
+        where = f"[{name}]"
+        if not name.strip():
+            errors.append(f"{where} שם תלונה ריק")
+        if not isinstance(blk, dict):
+            errors.append(f"{where} הבלוק חייב להיות אובייקט"); continue
+        for k in _dups(blk):
+            errors.append(f"{where} מפתח כפול {k!r} (השני דורס את הראשון)")
+        for field in blk.keys() - BLOCK_FIELDS:
+            errors.append(f"{where} שדה לא מוכר {field!r}")
+        for field, items in blk.items():
+            if field not in BLOCK_FIELDS:
+                continue
+            if not isinstance(items, list):
+                errors.append(f"{where}.{field} חייב להיות רשימה"); continue
+            if field == "rules":
+                _validate_rules(items, blk, where, errors); continue
+            for i, it in enumerate(items):
+                at = f"{where}.{field}[{i}]"
+                if field in TEXT_LISTS:
+                    if not isinstance(it, str) or not it.strip():
+                        errors.append(f"{at} חייב להיות טקסט לא ריק")
+                    continue
+                _validate_item(it, field, at, errors)
+                if field == "physical_exam" and isinstance(it, dict) and isinstance(it.get("label"), str):
+                    label = it["label"].strip()
+                    if label and not it.get("url") and videos.resolve(label).how == SEARCH:
+                        warnings.append(f"{at} אין קישור וידאו ל-{label!r}")
+    return errors, warnings
+
+
+# ========================= קומפילציה =========================
+def compile_pack(complaints: Dict[str, Any], video_map: Dict[str, List[str]], version: str) -> bytes:
+    """גוף ה-pack: טבלת פריטים ייחודיים (records.as_row) ובלוקים שמפנים לאינדקסים בה.
+    מחרוזות זהות הופכות לאותו אובייקט - marshal שומר אותן פעם אחת."""
+    videos = get_video_index(video_map)
+    for blk in complaints.values():
+        attach_video_links(blk, videos)
+    videos.save()
+    pool = Pool()
+    strings: Dict[str, str] = {}
+    rows: List[Tuple[Any, ...]] = []
+    index: Dict[Any, int] = {}
+    blocks: Dict[str, Dict[str, Tuple[Any, ...]]] = {}
+    for name, blk in complaints.items():
+        out: Dict[str, Tuple[Any, ...]] = {}
+        for field, items in pool.block(blk).items():
+            if field in ITEM_TYPES:
+                ids = []
+                for it in items:
+                    if it not in index:
+                        index[it] = len(rows)
+                        rows.append(tuple(strings.setdefault(v, v) if isinstance(v, str) else v
+                                          for v in as_row(it)))
+                    ids.append(index[it])
+                out[strings.setdefault(field, field)] = tuple(ids)
+            elif field == "rules":      # נשמרים כמו שהם (dict/list רגילים); rules.py מקמפל בטעינה
+                out[strings.setdefault(field, field)] = tuple(json.loads(json.dumps(items)))
+            else:
+                out[strings.setdefault(field, field)] = tuple(strings.setdefault(x, x) for x in items)
+        blocks[strings.setdefault(name, name)] = out
+    video = {strings.setdefault(k, k): [strings.setdefault(u, u) for u in v] for k, v in video_map.items()}
+    body = marshal.dumps((version, video, tuple(rows), blocks))
+    return (PACK_MAGIC + PACK_FORMAT.to_bytes(2, "little") + PY_MAGIC
+            + hashlib.sha256(body).digest() + body)
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--knowledge", default=KNOWLEDGE_PATH)
+    ap.add_argument("--videos", default=VIDEO_LINKS_PATH)
+    ap.add_argument("--out", default=PACK_PATH)
+    ap.add_argument("--strict", action="store_true", help="אזהרות נחשבות שגיאות")
+    ap.add_argument("--check", action="store_true", help="בדיקה בלבד, בלי לכתוב קובץ")
+    args = ap.parse_args(argv)
+
+    with open(args.knowledge, "rb") as f:
+        raw_k = f.read()
+    with open(args.videos, "rb") as f:
+        raw_v = f.read()
+    errors: List[str] = []
+    complaints = _load_strict(raw_k, "knowledge.json", errors)
+    video_map = _load_strict(raw_v, "video_links.json", errors)
+    if complaints is not None and video_map is not None:
+        e, warnings = validate(complaints, video_map)
+        errors += e
+    else:
+        warnings = []
+
+    for w in warnings:
+        print(f"warning: {w}", file=sys.stderr)
+    for e in errors:
+        print(f"error: {e}", file=sys.stderr)
+    if errors or (args.strict and warnings):
+        print(f"נכשל: {len(errors)} שגיאות, {len(warnings)} אזהרות", file=sys.stderr)
+        return 1
+    if args.check:
+        print(f"תקין: {len(complaints)} תלונות, {len(warnings)} אזהרות")
+        return 0
+
+    data = compile_pack(complaints, video_map, content_version(raw_k, raw_v))
+    tmp = args.out + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, args.out)   # האפליקציה לעולם לא רואה קובץ חצי כתוב
+    print(f"נכתב {args.out}: {len(complaints)} תלונות, {len(data)} bytes, {len(warnings)} אזהרות")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
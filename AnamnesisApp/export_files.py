@@ -0,0 +1,243 @@
+"""קבצים להורדה: צ'קליסט בירור (XLSX / HTML להדפסה) וחוברת תוכן מלאה (XLSX).
+
+    python export_files.py --out content.xlsx          כל התוכן לחוברת אחת (לביקורת)
+
+XLSX נכתב ב-openpyxl במצב write-only (שורות נזרמות לקובץ זמני, הזיכרון לא
+גדל עם התוכן). PDF: עמוד ה-HTML מעוצב להדפסה - "שמור כ-PDF" בדפדפן, בלי
+ספרייה וגופן עברי מוטמע.
+
+הצ'קליסט בשפה של הסשן (locales.py); חוברת התוכן תמיד בשפת המקור (לעריכה).
+
+כל קובץ נבנה פעם אחת לכל (גרסת תוכן, שפה, תלונות, כללים שהופעלו, תשובות) ונשמר
+במטמון משותף; הורדה חוזרת לא בונה מחדש. הבנייה לא מחזיקה נעילה משותפת -
+סשנים אחרים ממשיכים לרוץ.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Any, FrozenSet, Iterator, Optional, Tuple
+from collections import OrderedDict
+from datetime import date
+from html import escape
+import argparse
+import io
+import json
+import sys
+import threading
+
+from knowledge import Content, get_content
+from locales import SOURCE_LOCALE, Locale
+from merge import Merged, merge_blocks
+from records import ITEM_TYPES, Item, title
+from rules import get_rules, plan_block
+from textnorm import normalize
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DISCLAIMER = "Smart Anamnesis • התוכן להכוונה קלינית בלבד ואינו מחליף שיקול דעת רפואי"
+
+SECTIONS: Tuple[Tuple[str, str], ...] = (
+    ("questions", "אנמנזה"),
+    ("physical_exam", "בדיקה גופנית"),
+    ("labs", "מעבדה"),
+    ("imaging", "הדמיה"),
+    ("scores", "Scores"),
+    ("notes", "הערות"),
+)
+ANSWER_TEXT = {"yes": "כן", "no": "לא"}
+
+
+def detail(item: Item, t: Callable[[str], str] = str) -> str:
+    """כל השדות של פריט מלבד השם, בשורה אחת (t: תרגום, locales.Locale.t)."""
+    name = title(item)
+    return " · ".join(t(v) for f in item.__dataclass_fields__
+                      if f != "key" and (v := getattr(item, f)) and v != name)
+
+
+def plan(content: Content, names: Tuple[str, ...], fired: Tuple[FrozenSet[int], ...]) -> Merged:
+    idx = get_rules(content)
+    return merge_blocks(names, [plan_block(content, idx, n, f)[0] for n, f in zip(names, fired)])
+
+
+def _rows(m: Merged, answers: Dict[str, Any], loc: Locale) -> Iterator[Tuple[str, str, str, str]]:
+    """(מקטע, פריט, פרטים/תשובה, תלונות) לכל שורה בצ'קליסט."""
+    t = loc.t
+    for field, section in SECTIONS:
+        for e in m.fields[field]:
+            if field in ITEM_TYPES:
+                text, extra = t(title(e.item)), detail(e.item, t)
+            else:
+                a = answers.get(normalize(e.item)) if field == "questions" else None
+                extra = "" if a is None else t(ANSWER_TEXT.get(a, "")) or (f"{a:g}" if isinstance(a, float) else str(a))
+                text = t(e.item)
+            yield t(section), text, extra, " · ".join(map(t, e.sources))
+
+
+# ========================= מטמון =========================
+MAX_FILES = 64
+_lock = threading.Lock()
+_files: "OrderedDict[Tuple[Any, ...], bytes]" = OrderedDict()
+_building: Dict[Tuple[Any, ...], threading.Lock] = {}
+
+
+def cached(key: Tuple[Any, ...], build: Callable[[], bytes]) -> bytes:
+    """bytes מהמטמון, או בנייה אחת בלבד לכל key (בקשות מקבילות לאותו key ממתינות לה)."""
+    with _lock:
+        data = _files.get(key)
+        if data is not None:
+            _files.move_to_end(key)
+            return data
+        lock = _building.setdefault(key, threading.Lock())
+    with lock:
+        with _lock:
+            data = _files.get(key)
+        if data is None:
+            try:
+                data = build()
+            except BaseException:
+                with _lock:
+                    _building.pop(key, None)
+                raise
+            with _lock:                       # שמירה והסרת נעילת הבנייה יחד: אין חלון לבנייה כפולה
+                _files[key] = data
+                _building.pop(key, None)
+                while len(_files) > MAX_FILES:
+                    _files.popitem(last=False)
+    return data
+
+
+# ========================= XLSX =========================
+def _sheet(wb: Any, name: str, headers: List[str], widths: List[int], rtl: bool = True) -> Any:
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+    ws = wb.create_sheet(name[:31])
+    ws.sheet_view.rightToLeft = rtl
+    ws.freeze_panes = "A2"
+    for i, w in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(i)].width = w
+    bold = Font(bold=True)
+    cells = []
+    for h in headers:
+        c = WriteOnlyCell(ws, value=h)
+        c.font = bold
+        cells.append(c)
+    ws.append(cells)
+    return ws
+
+
+def _save(wb: Any) -> bytes:
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _checklist_xlsx(m: Merged, answers: Dict[str, Any], loc: Locale) -> bytes:
+    from openpyxl import Workbook
+    t = loc.t
+    wb = Workbook(write_only=True)
+    ws = _sheet(wb, t("צ'קליסט"), ["✓", *map(t, ("מקטע", "פריט", "פרטים / תשובה", "תלונות"))],
+                [5, 14, 40, 50, 30], loc.direction == "rtl")
+    ws.append(["", "", " + ".join(map(t, m.names)), date.today().isoformat(), ""])
+    for row in _rows(m, answers, loc):
+        ws.append(["☐", *row])
+    ws.append([])
+    ws.append(["", "", t(DISCLAIMER)])
+    return _save(wb)
+
+
+def _content_xlsx(content: Content) -> bytes:
+    """כל התוכן: גיליון לכל שדה, שורה לכל ערך (תלונה, ...). נזרם שורה-שורה."""
+    from openpyxl import Workbook
+    wb = Workbook(write_only=True)
+    ws = _sheet(wb, "תלונות", ["תלונה", "שמות נוספים", "שאלות", "בדיקות", "כללים"], [30, 40, 8, 8, 8])
+    for name in content.names:
+        blk = content.complaints[name]
+        ws.append([name, ", ".join(blk.get("aliases", ())), len(blk.get("questions", ())),
+                   sum(len(blk.get(f, ())) for f in ITEM_TYPES), len(blk.get("rules", ()))])
+    for field, section in SECTIONS:
+        if field in ITEM_TYPES:
+            cls = ITEM_TYPES[field]
+            cols = [f for f in cls.__dataclass_fields__ if f != "key"]
+            ws = _sheet(wb, section, ["תלונה", *cols], [30, *([40] * len(cols))])
+            for name in content.names:
+                for it in content.complaints[name].get(field, ()):
+                    ws.append([name, *(getattr(it, f) for f in cols)])
+        else:
+            ws = _sheet(wb, section, ["תלונה", "טקסט"], [30, 80])
+            for name in content.names:
+                for text in content.complaints[name].get(field, ()):
+                    ws.append([name, text])
+    ws = _sheet(wb, "כללים", ["תלונה", "כלל (JSON)"], [30, 120])
+    for name in content.names:
+        for r in content.complaints[name].get("rules", ()):
+            ws.append([name, json.dumps(r, ensure_ascii=False)])
+    return _save(wb)
+
+
+# ========================= HTML להדפסה =========================
+PRINT_CSS = """
+body{font-family:system-ui,-apple-system,"Segoe UI",Arial,sans-serif;max-width:900px;margin:0 auto;padding:16px;color:#111}
+h1{font-size:1.4em;margin:0 0 4px} h2{font-size:1.1em;margin:18px 0 6px;border-bottom:1px solid #ccc}
+table{width:100%;border-collapse:collapse} td{padding:4px 6px;vertical-align:top;border-bottom:1px solid #eee}
+td.box{width:1.5em;font-size:1.2em} .cap{font-size:.85em;color:#555}
+button{margin:8px 0;padding:6px 14px}
+@media print{button{display:none} body{padding:0} tr{break-inside:avoid}}
+"""
+
+
+def _checklist_html(m: Merged, answers: Dict[str, Any], loc: Locale) -> bytes:
+    t = loc.t
+    heading = escape(" + ".join(map(t, m.names)))
+    parts = [f"<h1>{heading}</h1><div class='cap'>{date.today().isoformat()}</div>",
+             f"<button onclick='print()'>{escape(t('🖨 הדפסה / שמירה כ-PDF'))}</button>"]
+    current = ""
+    for section, text, extra, sources in _rows(m, answers, loc):
+        if section != current:
+            parts.append(("</table>" if current else "") + f"<h2>{escape(section)}</h2><table>")
+            current = section
+        src = f" <span class='cap'>({escape(sources)})</span>" if len(m.names) > 1 else ""
+        parts.append(f"<tr><td class='box'>☐</td><td><b>{escape(text)}</b>{src}</td>"
+                     f"<td class='cap'>{escape(extra)}</td></tr>")
+    if current:
+        parts.append("</table>")
+    parts.append(f"<p class='cap'>{escape(t(DISCLAIMER))}</p>")
+    return (f"<!doctype html><html lang='{loc.code}' dir='{loc.direction}'><head><meta charset='utf-8'>"
+            f"<title>{heading}</title><style>{PRINT_CSS}</style></head>"
+            f"<body>{''.join(parts)}</body></html>\n").encode("utf-8")
+
+
+# ========================= API =========================
+def _key(kind: str, content: Content, names: Tuple[str, ...], fired: Tuple[FrozenSet[int], ...],
+         answers: Dict[str, Any], loc: Locale) -> Tuple[Any, ...]:
+    return (kind, content.version, loc.key, names, fired, tuple(sorted(answers.items())), date.today())
+
+
+def checklist_xlsx(content: Content, names: Tuple[str, ...], fired: Tuple[FrozenSet[int], ...],
+                   answers: Optional[Dict[str, Any]] = None, loc: Locale = SOURCE_LOCALE) -> bytes:
+    answers = answers or {}
+    return cached(_key("xlsx", content, names, fired, answers, loc),
+                  lambda: _checklist_xlsx(plan(content, names, fired), answers, loc))
+
+
+def checklist_html(content: Content, names: Tuple[str, ...], fired: Tuple[FrozenSet[int], ...],
+                   answers: Optional[Dict[str, Any]] = None, loc: Locale = SOURCE_LOCALE) -> bytes:
+    answers = answers or {}
+    return cached(_key("html", content, names, fired, answers, loc),
+                  lambda: _checklist_html(plan(content, names, fired), answers, loc))
+
+
+def content_xlsx(content: Content) -> bytes:
+    return cached(("content", content.version), lambda: _content_xlsx(content))
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="ייצוא כל התוכן לחוברת XLSX אחת")
+    ap.add_argument("--out", default="content.xlsx")
+    args = ap.parse_args(argv)
+    data = content_xlsx(get_content())
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print(f"נכתב {args.out}: {len(data)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
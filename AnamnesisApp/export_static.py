@@ -0,0 +1,141 @@
+"""ייצוא סטטי של כל התלונות (HTML + JSON) להגשה משרת קבצים/CDN או עבודה ללא רשת.
+
+    python app.py export --out dist/
+    python export_static.py --out dist/
+
+הייצוא אינקרמנטלי: manifest.json שומר hash לכל קובץ, ורק קבצים שהתוכן שלהם
+השתנה נכתבים מחדש (קבצים של תלונות שנמחקו מוסרים).
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Tuple
+from html import escape
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+from knowledge import Content, get_content
+from render import BASE_CSS, build_view
+from textnorm import normalize
+
+DISCLAIMER = "Smart Anamnesis • התוכן להכוונה קלינית בלבד ואינו מחליף שיקול דעת רפואי • נכתב ע\"י לירן שחר"
+
+STATIC_CSS = BASE_CSS + """
+body{font-family:system-ui,-apple-system,"Segoe UI",Arial,sans-serif;max-width:1200px;margin:0 auto;padding:12px 16px}
+@media (prefers-color-scheme:dark){body{background:#0e1117;color:#fafafa}a{color:#8ab4f8}}
+.cols{display:grid;grid-template-columns:repeat(3,1fr);gap:24px}
+@media (max-width:800px){.cols{grid-template-columns:1fr}}
+#q{width:100%;padding:8px 10px;font-size:1.05em;border-radius:8px;border:1px solid rgba(128,128,128,.4);box-sizing:border-box}
+.foot{margin-top:24px;font-size:.85em;opacity:.7}
+"""
+
+# JS לסינון ברשימת האינדקס; מנרמל כמו textnorm.normalize (ניקוד, אותיות סופיות, פיסוק)
+INDEX_JS = r"""
+const F={"ך":"כ","ם":"מ","ן":"נ","ף":"פ","ץ":"צ"};
+function norm(s){return s.replace(/[֑-ֽֿ-ׇ]/g,"").replace(/[ךםןףץ]/g,c=>F[c]).toLowerCase()
+  .replace(/[\s\-–—_/\\|,.;:!?()\[\]{}'"`׳״־+•·]+/g," ").trim();}
+const items=[...document.querySelectorAll("#list li")];
+document.getElementById("q").addEventListener("input",e=>{
+  const words=norm(e.target.value).split(" ").filter(Boolean);
+  for(const li of items){const k=li.dataset.k;li.hidden=!words.every(w=>k.includes(w));}
+});
+"""
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^\w]+", "-", name).strip("-") or "complaint"
+
+
+def _page(title: str, body: str, css_href: str) -> str:
+    return ("<!doctype html><html lang='he' dir='rtl'><head><meta charset='utf-8'>"
+            "<meta name='viewport' content='width=device-width,initial-scale=1'>"
+            f"<title>{escape(title)} · Smart Anamnesis</title>"
+            f"<link rel='stylesheet' href='{css_href}'></head>"
+            f"<body class='stApp'>{body}<div class='foot'>{escape(DISCLAIMER)}</div></body></html>\n")
+
+
+def complaint_page(name: str, blk: Dict[str, Any]) -> str:
+    view = build_view(name, blk)
+    body = ("<p><a href='../index.html'>→ כל התלונות</a></p>" + view.header
+            + "<div class='cols'>" + "".join(f"<div>{c}</div>" for c in view.columns) + "</div>"
+            + view.footer)
+    return _page(name, body, "../style.css")
+
+
+def _search_text(name: str, blk: Dict[str, Any]) -> str:
+    return normalize(" ".join([name, *blk.get("aliases", []), *blk.get("questions", [])]))
+
+
+def build_files(content: Content) -> Dict[str, str]:
+    """נתיב יחסי -> תוכן, לכל קבצי הבאנדל."""
+    files: Dict[str, str] = {"style.css": STATIC_CSS}
+    paths: Dict[str, str] = {}
+    entries: List[Dict[str, Any]] = []
+    for name in content.names:
+        base = slug(name)
+        path, n = f"c/{base}.html", 2
+        while path in files:                 # שמות שונים שמתקבלים לאותו slug
+            path, n = f"c/{base}-{n}.html", n + 1
+        blk = content.complaints[name]
+        files[path] = complaint_page(name, blk)
+        paths[name] = path
+        entries.append({"name": name, "url": path, "aliases": blk.get("aliases", []),
+                        "text": _search_text(name, blk)})
+    lis = "".join(f"<li data-k='{escape(e['text'])}'><a href='{escape(e['url'])}'>{escape(e['name'])}</a></li>"
+                  for e in entries)
+    body = ("<h1>🩺 Smart Anamnesis</h1>"
+            f"<p class='cap'>סה\"כ תלונות מוגדרות: {len(entries)}</p><div class='hr'></div>"
+            "<input id='q' type='search' placeholder='חיפוש תלונה' autofocus>"
+            f"<div class='card' style='margin-top:12px'><ul id='list'>{lis}</ul></div>"
+            f"<script>{INDEX_JS}</script>")
+    files["index.html"] = _page("תלונות", body, "style.css")
+    files["search.json"] = json.dumps({"version": content.version, "complaints": entries},
+                                      ensure_ascii=False, separators=(",", ":"))
+    return files
+
+
+def export(content: Content, out: str) -> Tuple[int, int, int]:
+    """כותב רק קבצים שה-hash שלהם השתנה. מחזיר (נכתבו, ללא שינוי, נמחקו)."""
+    manifest_path = os.path.join(out, "manifest.json")
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            old: Dict[str, str] = json.load(f).get("files", {})
+    except (FileNotFoundError, ValueError):
+        old = {}
+    new: Dict[str, str] = {}
+    written = unchanged = removed = 0
+    for rel, text in build_files(content).items():
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        new[rel] = digest
+        path = os.path.join(out, rel)
+        if old.get(rel) == digest and os.path.exists(path):
+            unchanged += 1
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        written += 1
+    for rel in old.keys() - new.keys():
+        try:
+            os.remove(os.path.join(out, rel)); removed += 1
+        except FileNotFoundError:
+            pass
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({"version": content.version, "files": new}, f, ensure_ascii=False, indent=0)
+    return written, unchanged, removed
+
+
+def main(argv: List[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="ייצוא סטטי של כל התלונות")
+    ap.add_argument("--out", default="dist")
+    args = ap.parse_args(argv)
+    written, unchanged, removed = export(get_content(), args.out)
+    print(f"{args.out}: נכתבו {written}, ללא שינוי {unchanged}, נמחקו {removed}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
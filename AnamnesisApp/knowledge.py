@@ -0,0 +1,206 @@
+"""טעינת תוכן התלונות (knowledge.json + video_links.json).
+
+התוכן נטען פעם אחת לתהליך ומשותף לכל הסשנים (קריאה בלבד).
+בכל ריצה נבדק רק stat של הקבצים; טעינה מחדש רק אם mtime/גודל השתנו
+ותוכן הקבצים (hash) באמת שונה.
+אם קיים knowledge.pack עדכני (build_knowledge.py) הוא נטען במקום ה-JSON.
+קובץ שנשמר חלקית או לא עובר בדיקה (build_knowledge.validate) נרשם ללוג, והאפליקציה
+ממשיכה להגיש את הגרסה התקינה האחרונה עד שהקובץ מתוקן.
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from importlib.util import MAGIC_NUMBER as PY_MAGIC
+import hashlib
+import json
+import logging
+import marshal
+import os
+import threading
+
+from metrics import timed
+from records import ITEM_TYPES, Pool, from_row
+from video_index import VideoIndex, get_index as get_video_index
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KNOWLEDGE_PATH = os.path.join(BASE_DIR, "knowledge.json")
+VIDEO_LINKS_PATH = os.path.join(BASE_DIR, "video_links.json")
+PACK_PATH = os.path.join(BASE_DIR, "knowledge.pack")
+
+# כותרת knowledge.pack: magic | גרסת פורמט (2) | magic של פייתון (4) | sha256 (32) | גוף marshal
+PACK_MAGIC = b"ANPK"
+PACK_FORMAT = 2
+_PACK_HEADER = len(PACK_MAGIC) + 2 + len(PY_MAGIC) + 32
+
+
+@dataclass(frozen=True)
+class Content:
+    version: str                                  # hash של קבצי המקור
+    complaints: Mapping[str, Dict[str, Tuple[Any, ...]]]   # שם תלונה -> בלוק (records.py)
+    video_map: Mapping[str, List[str]]            # label -> קישורים
+    names: Tuple[str, ...]                        # שמות ממוינים לבחירה
+
+
+# ========================= קישורי וידאו =========================
+def attach_video_links(block: Dict[str, Any], video_map: Mapping[str, List[str]] | VideoIndex) -> None:
+    """url לכל בדיקה גופנית בלי url: מדויק / מנורמל / עמום / חיפוש (video_index.py)."""
+    index = video_map if isinstance(video_map, VideoIndex) else get_video_index(video_map)
+    for it in block.get("physical_exam", []):
+        if isinstance(it, dict):
+            label = (it.get("label") or "").strip()
+            if label and not it.get("url"):
+                it["url"] = index.resolve(label).url
+
+
+# ========================= טעינה =========================
+def _stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        s = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (s.st_mtime_ns, s.st_size)
+
+
+def _read(path: str) -> bytes:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return b"{}"
+
+
+def content_version(raw_knowledge: bytes, raw_videos: bytes) -> str:
+    return hashlib.sha256(raw_knowledge + b"\0" + raw_videos).hexdigest()[:16]
+
+
+def _make(version: str, complaints: Dict[str, Dict[str, Tuple[Any, ...]]],
+          video_map: Dict[str, List[str]]) -> Content:
+    return Content(version, MappingProxyType(complaints), MappingProxyType(video_map),
+                   tuple(sorted(complaints)))
+
+
+class ContentError(ValueError):
+    """knowledge.json / video_links.json לא תקינים (JSON או סכמה)."""
+
+
+def _build(raw_knowledge: bytes, raw_videos: bytes, version: str) -> Content:
+    from build_knowledge import validate          # build_knowledge מייבא את המודול הזה
+    try:
+        complaints: Dict[str, Dict[str, Any]] = json.loads(raw_knowledge)
+        video_map: Dict[str, List[str]] = json.loads(raw_videos)
+    except ValueError as e:                       # כולל JSONDecodeError / UnicodeDecodeError
+        raise ContentError(f"JSON לא תקין: {e}") from e
+    errors, _ = validate(complaints, video_map)
+    if errors:
+        raise ContentError("; ".join(errors[:5]) + (f" (+{len(errors) - 5})" if len(errors) > 5 else ""))
+    with timed("attach_video_links"):
+        index = get_video_index(video_map)
+        for blk in complaints.values():
+            attach_video_links(blk, index)
+        index.save()
+    pool = Pool()
+    return _make(version, {name: pool.block(blk) for name, blk in complaints.items()}, video_map)
+
+
+def load_pack(raw: bytes) -> Optional[Content]:
+    """knowledge.pack -> Content; None אם הפורמט/גרסת פייתון/checksum לא תואמים."""
+    head = raw[:_PACK_HEADER]
+    if (len(head) < _PACK_HEADER or not head.startswith(PACK_MAGIC)
+            or int.from_bytes(head[4:6], "little") != PACK_FORMAT or head[6:10] != PY_MAGIC):
+        return None
+    body = raw[_PACK_HEADER:]
+    if hashlib.sha256(body).digest() != head[10:]:
+        return None
+    try:
+        version, video_map, rows, blocks = marshal.loads(body)
+        items = [from_row(r) for r in rows]          # כל פריט ייחודי נבנה פעם אחת
+        complaints = {name: {field: tuple(items[i] for i in v) if field in ITEM_TYPES else v
+                             for field, v in blk.items()}
+                      for name, blk in blocks.items()}
+    except (ValueError, EOFError, TypeError, IndexError):
+        return None
+    return _make(version, complaints, video_map)
+
+
+# ========================= שכבת עדכונים (Google Sheets, ראה sheets_sync.py) =========================
+def _overlaid(base: Content, current: Content, changes: Mapping[str, Optional[Dict[str, Any]]],
+              revision: str) -> Content:
+    """מחיל רק את התלונות שהשתנו על התוכן הנוכחי. None = חזרה לתוכן מהקובץ (או מחיקה)."""
+    complaints = dict(current.complaints)
+    pool = Pool()
+    for name, blk in changes.items():
+        if blk is None:
+            if name in base.complaints:
+                complaints[name] = base.complaints[name]
+            else:
+                complaints.pop(name, None)
+        else:
+            blk = json.loads(json.dumps(blk))         # עותק: attach_video_links כותב לתוכו
+            attach_video_links(blk, base.video_map)
+            complaints[name] = pool.block(blk)
+    version = base.version if not revision else \
+        hashlib.sha256(f"{base.version}|{revision}".encode()).hexdigest()[:16]
+    return _make(version, complaints, dict(base.video_map))
+
+
+_lock = threading.Lock()
+_stamp: Tuple[Any, ...] = ()
+_base: Optional[Content] = None          # מהקבצים בלבד
+_content: Optional[Content] = None       # _base + _overlay
+_overlay: Dict[str, Dict[str, Any]] = {}
+_overlay_rev = ""
+
+
+def apply_overlay(changes: Mapping[str, Optional[Dict[str, Any]]], revision: str) -> None:
+    """עדכון חלק מהתלונות בזיכרון (בלוקים בפורמט knowledge.json). לא נוגע בקבצים."""
+    global _content, _overlay_rev
+    get_content()
+    with _lock:
+        for name, blk in changes.items():
+            if blk is None:
+                _overlay.pop(name, None)
+            else:
+                _overlay[name] = blk
+        _overlay_rev = revision if _overlay else ""
+        assert _base is not None and _content is not None
+        _content = _overlaid(_base, _content, changes, _overlay_rev)
+
+
+def get_content() -> Content:
+    """התוכן הנוכחי; זול כשאין שינוי בקבצים (שלושה stat בלבד)."""
+    global _stamp, _base, _content
+    stamp = (_stat(KNOWLEDGE_PATH), _stat(VIDEO_LINKS_PATH), _stat(PACK_PATH))
+    if _content is not None and stamp == _stamp:
+        return _content
+    with _lock:
+        if _content is not None and stamp == _stamp:
+            return _content
+        base = None
+        src, pack = [s for s in stamp[:2] if s], stamp[2]
+        if pack and all(pack[0] >= s[0] for s in src):
+            # pack חדש מהמקורות: אין צורך לקרוא/לפרסר JSON
+            with timed("content_load_pack"):
+                base = load_pack(_read(PACK_PATH))
+        if base is None:
+            raw_k, raw_v = _read(KNOWLEDGE_PATH), _read(VIDEO_LINKS_PATH)
+            version = content_version(raw_k, raw_v)
+            if _base is not None and _base.version == version:
+                base = _base
+            else:
+                try:
+                    with timed("content_build"):
+                        base = _build(raw_k, raw_v, version)
+                except ContentError as e:
+                    if _content is None:              # אין גרסה קודמת להגיש
+                        raise
+                    log.error("knowledge reload skipped, serving %s: %s", _content.version, e)
+                    _stamp = stamp                    # לא לנסות שוב עד שהקבצים ישתנו
+                    return _content
+        if _base is None or _base.version != base.version:
+            _base = base
+            _content = _overlaid(base, base, _overlay, _overlay_rev) if _overlay else base
+        _stamp = stamp
+        return _content
@@ -0,0 +1,164 @@
+"""שפות: טבלת מחרוזות לכל locale מעל מבנה תוכן אחד (knowledge.json, עברית).
+
+המבנה - תלונות, keys של פריטים, scores, קישורי וידאו, כללים ותשובות - משותף
+לכל השפות. locale הוא רק מיפוי "מחרוזת מקור -> תרגום" (locales/<code>.json);
+מחרוזת בלי תרגום מוצגת במקור. לכן תשובות, בחירת תלונות ו-keys זהים בכל שפה.
+
+locale נטען רק כשסשן מבקש אותו לראשונה (?lang=en או בורר השפה) ומשותף לכל
+הסשנים. מה שנגזר ממנו (תצוגות HTML, אינדקס חיפוש, אינדקס שימוש, קבצי ייצוא)
+נשמר במטמון לפי locale - הזיכרון גדל עם השפות שבשימוש, לא עם השפות הקיימות.
+
+    python locales.py en        מחרוזות תוכן/scores בלי תרגום ל-en
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Iterable, Iterator, Mapping, Optional, Tuple
+from dataclasses import dataclass
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCALES_DIR = os.path.join(BASE_DIR, "locales")
+SOURCE = "he"                                       # שפת knowledge.json
+
+LANGUAGE_NAMES = {"he": "עברית", "en": "English", "ar": "العربية", "ru": "Русский"}
+RTL = frozenset({"he", "ar", "fa", "ur", "yi"})
+_CODE = re.compile(r"^[a-z]{2,3}$")                 # גם מונע נתיב שרירותי מ-?lang=
+_SOURCE_TEXT = re.compile(r"[א-ת]")                  # מחרוזת שצריכה תרגום
+
+
+@dataclass(frozen=True)
+class Locale:
+    code: str
+    version: str                                    # hash של קובץ המחרוזות ("" למקור)
+    strings: Mapping[str, str]
+    aliases: Mapping[str, Tuple[str, ...]]          # תלונה -> שמות נוספים לחיפוש בשפה
+
+    @property
+    def direction(self) -> str:
+        return "rtl" if self.code in RTL else "ltr"
+
+    @property
+    def key(self) -> str:
+        """חלק ממפתח מטמון: שפה + גרסת קובץ המחרוזות."""
+        return f"{self.code}:{self.version}"
+
+    def t(self, text: str) -> str:
+        return self.strings.get(text, text)
+
+
+SOURCE_LOCALE = Locale(SOURCE, "", {}, {})
+
+
+def language_name(code: str) -> str:
+    return LANGUAGE_NAMES.get(code, code.upper())
+
+
+def available() -> Tuple[str, ...]:
+    """שפות שיש להן קובץ (בלי לטעון אותו)."""
+    try:
+        codes = sorted(f[:-5] for f in os.listdir(LOCALES_DIR) if f.endswith(".json") and _CODE.match(f[:-5]))
+    except OSError:
+        codes = []
+    return (SOURCE, *(c for c in codes if c != SOURCE))
+
+
+def _load(code: str, path: str) -> Locale:
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    strings = {sys.intern(k): sys.intern(v) for k, v in data.get("strings", {}).items() if v}
+    aliases = {k: tuple(v) for k, v in data.get("aliases", {}).items()}
+    return Locale(code, hashlib.sha256(raw).hexdigest()[:12], strings, aliases)
+
+
+# ========================= טעינה לפי דרישה =========================
+_lock = threading.Lock()
+_loaded: Dict[str, Tuple[float, Locale]] = {}       # code -> (mtime, locale); רק שפות שהתבקשו
+
+
+def get_locale(code: Optional[str]) -> Locale:
+    """locale משותף לכל הסשנים; נטען בבקשה הראשונה ומחדש רק כשהקובץ משתנה.
+
+    שפה לא מוכרת (או בלי קובץ) -> שפת המקור.
+    """
+    if not code or code == SOURCE or not _CODE.match(code):
+        return SOURCE_LOCALE
+    path = os.path.join(LOCALES_DIR, f"{code}.json")
+    try:
+        mtime = os.stat(path).st_mtime
+    except OSError:
+        return SOURCE_LOCALE
+    hit = _loaded.get(code)
+    if hit is None or hit[0] != mtime:
+        with _lock:
+            hit = _loaded.get(code)
+            if hit is None or hit[0] != mtime:
+                hit = _loaded[code] = (mtime, _load(code, path))
+    return hit[1]
+
+
+def loaded() -> Tuple[str, ...]:
+    return tuple(_loaded)
+
+
+# ========================= CLI: מחרוזות חסרות =========================
+def content_strings(complaints: Mapping[str, Mapping[str, Any]]) -> Iterator[str]:
+    """כל מחרוזת תצוגה בתוכן (JSON גולמי): שמות, שאלות, הערות, שדות פריטים, פריטים בכללים."""
+    for name, blk in complaints.items():
+        yield name
+        for field, values in blk.items():
+            if field == "aliases":
+                continue
+            if field == "rules":
+                values = [it for r in values for items in r.get("add", {}).values() for it in items]
+            for v in values:
+                if isinstance(v, str):
+                    yield v
+                else:
+                    yield from (x for k, x in v.items() if k not in ("url", "ref") and isinstance(x, str))
+
+
+def score_strings() -> Iterator[str]:
+    from scores_engine import COLUMN_LABELS, SCORES
+    for d in SCORES.values():
+        yield d.name
+        for cr in d.criteria:
+            yield from (cr.label, cr.unit, *cr.options)
+        yield from (label for _, label in d.bands)
+    yield from COLUMN_LABELS.values()
+
+
+def missing(locale: Locale, strings: Iterable[str]) -> List[str]:
+    out: Dict[str, None] = {}
+    for s in strings:
+        if s and _SOURCE_TEXT.search(s) and s not in locale.strings:
+            out.setdefault(s)
+    return list(out)
+
+
+def main(argv: List[str] | None = None) -> int:
+    from knowledge import KNOWLEDGE_PATH
+    ap = argparse.ArgumentParser(description="מחרוזות תוכן/scores בלי תרגום")
+    ap.add_argument("code", help=f"שפה ({', '.join(available()[1:])})")
+    ap.add_argument("--knowledge", default=KNOWLEDGE_PATH)
+    args = ap.parse_args(argv)
+    loc = get_locale(args.code)
+    if loc is SOURCE_LOCALE:
+        print(f"אין קובץ {os.path.join(LOCALES_DIR, args.code + '.json')}", file=sys.stderr)
+        return 2
+    with open(args.knowledge, encoding="utf-8") as f:
+        complaints = json.load(f)
+    todo = missing(loc, [*content_strings(complaints), *score_strings()])
+    for s in todo:
+        print(s)
+    print(f"{len(todo)} מחרוזות בלי תרגום ({len(loc.strings)} מתורגמות)", file=sys.stderr)
+    return 1 if todo else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
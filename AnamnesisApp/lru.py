@@ -0,0 +1,37 @@
+"""מטמון קטן עם פינוי לפי שימוש אחרון, משותף ל-merge.py ו-render.py.
+
+כשהמטמון מתמלא יוצא רק הצירוף שלא נוגע בו הכי הרבה זמן - צירופים מבוקשים
+(ואלה ש-popular.warm בנה מראש) נשארים חמים.
+"""
+from __future__ import annotations
+from typing import Generic, Hashable, Optional, TypeVar
+from collections import OrderedDict
+import threading
+
+V = TypeVar("V")
+
+
+class LRU(Generic[V]):
+    __slots__ = ("_data", "_max", "_lock")
+
+    def __init__(self, size: int) -> None:
+        self._data: "OrderedDict[Hashable, V]" = OrderedDict()
+        self._max = size
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: V) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._max:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
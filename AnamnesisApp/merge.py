@@ -0,0 +1,116 @@
+"""איחוד כמה תלונות לתוכנית בירור אחת, בלי כפילויות.
+
+לכל תלונה נבנה פעם אחת (לגרסת תוכן) פרופיל: שדה -> {key: פריט}. האיחוד הוא
+פעולות על מפתחות מוכנים מראש - לא השוואה של dicts מקוננים - וכל פריט מסומן
+בתלונות שדרשו אותו. פריט שמופיע בכמה תלונות מוצג בניסוח של הראשונה.
+"""
+from __future__ import annotations
+from typing import AbstractSet, Dict, List, Any, Sequence, Tuple
+from dataclasses import dataclass
+import threading
+
+from knowledge import Content
+from lru import LRU
+from records import ITEM_TYPES
+from textnorm import normalize
+
+TEXT_FIELDS = ("questions", "notes")
+
+Profile = Dict[str, Dict[str, Any]]     # שדה -> {key: פריט / טקסט}
+
+
+@dataclass(frozen=True)
+class MergedEntry:
+    item: Any                     # רשומה (records.py) או טקסט
+    sources: Tuple[str, ...]      # התלונות שדרשו את הפריט
+    added: bool = False           # נוסף בגלל כלל בכל התלונות שדרשו אותו (rules.plan_block)
+
+
+@dataclass(frozen=True)
+class Merged:
+    names: Tuple[str, ...]
+    fields: Dict[str, Tuple[MergedEntry, ...]]
+
+
+def _profile(blk: Dict[str, Tuple[Any, ...]]) -> Profile:
+    prof: Profile = {}
+    for field in ITEM_TYPES:
+        prof[field] = {}
+        for it in blk.get(field, ()):
+            prof[field].setdefault(it.key, it)
+    for field in TEXT_FIELDS:
+        prof[field] = {}
+        for text in blk.get(field, ()):
+            prof[field].setdefault(normalize(text), text)
+    return prof
+
+
+def merge_profiles(names: Tuple[str, ...], profiles: List[Profile],
+                   added: Sequence[AbstractSet[str]] = ()) -> Merged:
+    """added[i] = keys שנוספו בכללים לתלונה i; פריט מסומן רק אם אף תלונה לא דורשת אותו מעצמה."""
+    fields: Dict[str, Tuple[MergedEntry, ...]] = {}
+    added = list(added) or [frozenset()] * len(names)
+    for field in (*TEXT_FIELDS, *ITEM_TYPES):
+        maps = [p[field] for p in profiles]
+        order: Dict[str, Any] = {}
+        for m in maps:                          # סדר הופעה ראשון; הניסוח של התלונה הראשונה
+            for key, it in m.items():
+                order.setdefault(key, it)
+        entries = []
+        for key, it in order.items():
+            having = [i for i, m in enumerate(maps) if key in m]
+            by_rule = field in ITEM_TYPES and all(it.key in added[i] for i in having)
+            entries.append(MergedEntry(it, tuple(names[i] for i in having), by_rule))
+        fields[field] = tuple(entries)
+    return Merged(names, fields)
+
+
+def merge_blocks(names: Tuple[str, ...], blocks: List[Dict[str, Tuple[Any, ...]]],
+                 added: Sequence[AbstractSet[str]] = ()) -> Merged:
+    """איחוד בלוקים שכבר חושבו (למשל אחרי כללים - rules.plan_block), בלי מטמון."""
+    return merge_profiles(names, [_profile(b) for b in blocks], added)
+
+
+# ========================= מטמון לפי גרסת תוכן =========================
+MAX_MERGED = 256
+KEEP_VERSIONS = 2                       # הגרסה הנוכחית + ריצות שעדיין מחזיקות את הקודמת
+
+
+class _Cache:
+    """פרופילים ואיחודים של גרסת תוכן אחת."""
+    __slots__ = ("profiles", "merged")
+
+    def __init__(self) -> None:
+        self.profiles: Dict[str, Profile] = {}
+        self.merged: LRU[Merged] = LRU(MAX_MERGED)
+
+
+_lock = threading.Lock()
+_caches: LRU[_Cache] = LRU(KEEP_VERSIONS)
+
+
+def _cache(content: Content) -> _Cache:
+    """המטמון של content.version - ריצה עם Content ישן כותבת רק למטמון של הגרסה שלה."""
+    cache = _caches.get(content.version)
+    if cache is None:
+        with _lock:
+            cache = _caches.get(content.version)
+            if cache is None:
+                cache = _Cache()
+                _caches.put(content.version, cache)
+    return cache
+
+
+def merged(content: Content, names: Tuple[str, ...]) -> Merged:
+    cache = _cache(content)
+    m = cache.merged.get(names)
+    if m is None:
+        profiles = []
+        for n in names:
+            p = cache.profiles.get(n)
+            if p is None:
+                p = cache.profiles[n] = _profile(content.complaints[n])
+            profiles.append(p)
+        m = merge_profiles(names, profiles)
+        cache.merged.put(names, m)
+    return m
@@ -0,0 +1,229 @@
+"""מדידת זמנים ו-deltas לכל שלב בריצת app.py (opt-in).
+
+    ANAMNESIS_METRICS=1 streamlit run app.py          הפעלה
+    ANAMNESIS_METRICS_LOG=metrics.jsonl               שורת JSON לכל ריצה
+    ANAMNESIS_METRICS_PROM=/var/lib/node_exporter/anamnesis.prom
+                                                      dump בפורמט Prometheus (textfile collector)
+    http://localhost:8501/?debug=1                    פאנל דיבאג מוסתר
+
+כשהמדידה כבויה timed() מחזיר nullcontext משותף ו-instrument() מחזיר את
+הפונקציה עצמה - אין עלות מעבר לקריאת פונקציה אחת לכל שלב.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Any, Optional, Tuple, TypeVar
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("ANAMNESIS_METRICS", "").lower() in ("1", "true", "yes")
+LOG_PATH = os.environ.get("ANAMNESIS_METRICS_LOG", "")
+PROM_PATH = os.environ.get("ANAMNESIS_METRICS_PROM", "")
+PROM_EVERY = 10.0        # שניות בין כתיבות של קובץ ה-Prometheus
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DELTA_BUCKETS = (5, 10, 20, 50, 100, 200, 500)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)      # האחרון = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """הערכה לפי הגבול העליון של ה-bucket (כמו histogram_quantile, בלי אינטרפולציה)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+        return self.buckets[-1]
+
+
+class Rerun:
+    """מדידות של ריצה אחת: שלב -> [שניות, deltas]."""
+    __slots__ = ("session", "start", "deltas", "phases")
+
+    def __init__(self, session: str) -> None:
+        self.session = session
+        self.start = time.perf_counter()
+        self.deltas = 0
+        self.phases: Dict[str, List[float]] = {}
+
+
+# ========================= מצב משותף לתהליך =========================
+_lock = threading.Lock()
+_seconds: Dict[str, Histogram] = {}
+_deltas: Dict[str, int] = {}
+_rerun_seconds = Histogram(SECONDS_BUCKETS)
+_rerun_deltas = Histogram(DELTA_BUCKETS)
+_last: Optional[Rerun] = None
+_local = threading.local()          # הריצה הנוכחית של ה-thread (thread לכל סשן)
+_prom_written = 0.0
+
+
+def _record(phase: str, seconds: float, deltas: int) -> None:
+    with _lock:
+        h = _seconds.get(phase)
+        if h is None:
+            h = _seconds[phase] = Histogram(SECONDS_BUCKETS)
+        h.observe(seconds)
+        _deltas[phase] = _deltas.get(phase, 0) + deltas
+
+
+def _current() -> Optional[Rerun]:
+    return getattr(_local, "rerun", None)
+
+
+@contextmanager
+def _timed(phase: str):
+    run = _current()
+    d0 = run.deltas if run else 0
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        deltas = run.deltas - d0 if run else 0
+        _record(phase, seconds, deltas)
+        if run is not None:
+            p = run.phases.setdefault(phase, [0.0, 0])
+            p[0] += seconds
+            p[1] += deltas
+
+
+_NULL = nullcontext()
+
+
+def timed(phase: str):
+    """with timed("selectbox"): ...  - זמן + deltas שנשלחו בתוך הבלוק."""
+    return _timed(phase) if ENABLED else _NULL
+
+
+def instrument(phase: str) -> Callable[[F], F]:
+    """דקורטור לפונקציות render_*; כשהמדידה כבויה מחזיר את הפונקציה כמו שהיא."""
+    def deco(fn: F) -> F:
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with _timed(phase):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return deco
+
+
+# ========================= גבולות ריצה =========================
+def _count_deltas(ctx: Any) -> None:
+    """עוטף פעם אחת את תור ההודעות של הסשן כדי לספור deltas לריצה הנוכחית."""
+    if getattr(ctx, "_anamnesis_counted", False):
+        return
+    enqueue = ctx._enqueue
+
+    def counting(msg: Any) -> None:
+        run = _current()
+        if run is not None and msg.HasField("delta"):
+            run.deltas += 1
+        enqueue(msg)
+    ctx._enqueue = counting
+    ctx._anamnesis_counted = True
+
+
+def begin_rerun() -> None:
+    if not ENABLED:
+        return
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        _count_deltas(ctx)
+    _local.rerun = Rerun(ctx.session_id if ctx is not None else "")
+
+
+def end_rerun() -> None:
+    global _last
+    run = _current()
+    if run is None:
+        return
+    _local.rerun = None
+    seconds = time.perf_counter() - run.start
+    with _lock:
+        _rerun_seconds.observe(seconds)
+        _rerun_deltas.observe(run.deltas)
+        _last = run
+    if LOG_PATH:
+        line = {"ts": round(time.time(), 3), "session": run.session, "ms": round(seconds * 1000, 3),
+                "deltas": run.deltas,
+                "phases": {p: {"ms": round(s * 1000, 3), "deltas": d} for p, (s, d) in run.phases.items()}}
+        with _lock, open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    if PROM_PATH:
+        _write_prometheus()
+
+
+# ========================= ייצוא =========================
+def _hist_lines(name: str, h: Histogram, labels: str = "") -> List[str]:
+    sep = "," if labels else ""
+    lines, acc = [], 0
+    for le, c in zip((*h.buckets, "+Inf"), h.counts):
+        acc += c
+        lines.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {acc}')
+    lab = f"{{{labels}}}" if labels else ""
+    lines += [f"{name}_sum{lab} {h.sum:.6f}", f"{name}_count{lab} {h.count}"]
+    return lines
+
+
+def prometheus_text() -> str:
+    with _lock:
+        lines = ["# HELP anamnesis_phase_seconds זמן לכל שלב בריצה", "# TYPE anamnesis_phase_seconds histogram"]
+        for phase, h in sorted(_seconds.items()):
+            lines += _hist_lines("anamnesis_phase_seconds", h, f'phase="{phase}"')
+        lines += ["# HELP anamnesis_phase_deltas_total deltas שנשלחו בכל שלב",
+                  "# TYPE anamnesis_phase_deltas_total counter"]
+        lines += [f'anamnesis_phase_deltas_total{{phase="{p}"}} {d}' for p, d in sorted(_deltas.items())]
+        lines += ["# TYPE anamnesis_rerun_seconds histogram", *_hist_lines("anamnesis_rerun_seconds", _rerun_seconds),
+                  "# TYPE anamnesis_rerun_deltas histogram", *_hist_lines("anamnesis_rerun_deltas", _rerun_deltas)]
+    return "\n".join(lines) + "\n"
+
+
+def _write_prometheus() -> None:
+    global _prom_written
+    now = time.monotonic()
+    if now - _prom_written < PROM_EVERY:
+        return
+    _prom_written = now
+    tmp = PROM_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp, PROM_PATH)
+
+
+def summary() -> List[Dict[str, Any]]:
+    """שורה לכל שלב: מספר מדידות, ממוצע, p50/p95 (ms) ו-deltas ממוצעים - לפאנל הדיבאג."""
+    with _lock:
+        rows = [("rerun", _rerun_seconds, _rerun_deltas.sum)] + \
+            [(p, h, _deltas.get(p, 0)) for p, h in sorted(_seconds.items())]
+        return [{"phase": p, "n": h.count, "mean_ms": round(h.sum / h.count * 1000, 3) if h.count else 0.0,
+                 "p50_ms": h.quantile(0.5) * 1000, "p95_ms": h.quantile(0.95) * 1000,
+                 "deltas": round(d / h.count, 1) if h.count else 0.0} for p, h, d in rows]
+
+
+def last_rerun() -> Dict[str, Tuple[float, int]]:
+    run = _last
+    return {p: (round(s * 1000, 3), int(d)) for p, (s, d) in run.phases.items()} if run else {}
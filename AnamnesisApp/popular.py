@@ -0,0 +1,110 @@
+"""תצוגות מבוקשות: מונה בקשות לכל (שפה, תלונות) וחימום מראש של המבוקשות ביותר.
+
+כל בחירה חדשה של תלונה/צירוף תלונות בסשן נרשמת (record). לכל גרסת תוכן
+(עלייה, עדכון מגיליון) thread ברקע בונה מראש את תצוגות ה-HTML של WARM_TOP
+המבוקשות ביותר (render.merged_view), כך שקישור עמוק (?c=...) לתלונה פופולרית
+מקבל תצוגה מוכנה כבר בריצה הראשונה.
+
+המונים נשמרים ב-view_stats.json (כל SAVE_EVERY בקשות), כך שהחימום אחרי הפעלה
+מחדש מתבסס על השימוש בפועל. מספר הצירופים שנספרים מוגבל ל-MAX_KEYS.
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Optional, Tuple
+from collections import Counter
+import json
+import os
+import threading
+
+from knowledge import Content
+from locales import Locale, get_locale
+from render import merged_view
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATS_PATH = os.path.join(BASE_DIR, "view_stats.json")
+WARM_TOP = 16
+SAVE_EVERY = 25
+MAX_KEYS = 512
+
+Key = Tuple[str, Tuple[str, ...]]       # (שפה, תלונות)
+
+_lock = threading.Lock()
+_counts: Optional["Counter[Key]"] = None
+_unsaved = 0
+_warmed = ""                            # גרסת התוכן האחרונה שחוממה
+
+
+def _stats() -> "Counter[Key]":
+    """המונים (נטענים מהדיסק בפעם הראשונה); נקרא תחת _lock."""
+    global _counts
+    if _counts is None:
+        _counts = Counter()
+        try:
+            with open(STATS_PATH, encoding="utf-8") as f:
+                for code, names, n in json.load(f).get("views", ()):
+                    _counts[(code, tuple(names))] = int(n)
+        except (FileNotFoundError, ValueError, TypeError):
+            pass
+    return _counts
+
+
+def _save(rows: List[List[Any]]) -> None:
+    tmp = STATS_PATH + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"views": rows}, f, ensure_ascii=False, indent=0)
+        os.replace(tmp, STATS_PATH)
+    except OSError:                     # תיקייה לקריאה בלבד: המונים רק בזיכרון
+        pass
+
+
+def record(names: Tuple[str, ...], loc: Locale) -> None:
+    """בקשה לתצוגה של names בשפה loc."""
+    global _unsaved
+    with _lock:
+        counts = _stats()
+        counts[(loc.code, names)] += 1
+        if len(counts) > MAX_KEYS:      # שומרים את החצי המבוקש יותר
+            keep = counts.most_common(MAX_KEYS // 2)
+            counts.clear()
+            counts.update(dict(keep))
+        _unsaved += 1
+        rows = None
+        if _unsaved >= SAVE_EVERY:
+            _unsaved = 0
+            rows = [[code, list(ns), n] for (code, ns), n in counts.most_common()]
+    if rows is not None:
+        _save(rows)
+
+
+def top(n: int = WARM_TOP) -> List[Tuple[Key, int]]:
+    with _lock:
+        return _stats().most_common(n)
+
+
+def warm(content: Content, n: int = WARM_TOP) -> int:
+    """בונה מראש את התצוגות של n הצירופים המבוקשים ביותר; מחזיר כמה נבנו."""
+    built = 0
+    for (code, names), _ in top(n):
+        if all(name in content.complaints for name in names):      # תלונה שנמחקה/שונה שמה
+            merged_view(content, names, get_locale(code))
+            built += 1
+    return built
+
+
+def ensure_warm(content: Content) -> None:
+    """פעם אחת לכל גרסת תוכן: חימום ב-thread ברקע (הריצה הנוכחית לא מחכה)."""
+    global _warmed
+    if _warmed == content.version:
+        return
+    with _lock:
+        if _warmed == content.version:
+            return
+        _warmed = content.version
+    threading.Thread(target=warm, args=(content,), name="anamnesis-warm", daemon=True).start()
+
+
+def stats() -> Dict[str, Any]:
+    """לפאנל הדיבאג: מספר צירופים שנספרו והמבוקשים ביותר."""
+    with _lock:
+        counts = _stats()
+        return {"keys": len(counts), "top": [(code, " + ".join(ns), n) for (code, ns), n in counts.most_common(5)]}
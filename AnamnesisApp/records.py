@@ -0,0 +1,110 @@
+"""מודל תוכן: רשומות קומפקטיות (frozen + __slots__) לפריטי בדיקה גופנית, מעבדה, הדמיה ו-scores.
+
+פריטים זהים בין תלונות (למשל "CBC" או "צילום חזה") הם אותו מופע - נבנים
+פעם אחת דרך Pool. לכל פריט יש key מנורמל (סוג + שם) לזיהוי בין תלונות.
+"""
+from __future__ import annotations
+from typing import Dict, Any, Tuple, Type, Union
+from dataclasses import dataclass
+import sys
+
+from textnorm import normalize
+
+
+@dataclass(frozen=True, slots=True)
+class Exam:
+    label: str
+    url: str = ""
+    key: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.key:
+            object.__setattr__(self, "key", "exam:" + normalize(self.label))
+
+
+@dataclass(frozen=True, slots=True)
+class Lab:
+    test: str
+    why: str = ""
+    when: str = ""
+    key: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.key:
+            object.__setattr__(self, "key", "lab:" + normalize(self.test))
+
+
+@dataclass(frozen=True, slots=True)
+class Imaging:
+    modality: str
+    trigger: str = ""
+    key: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.key:
+            object.__setattr__(self, "key", "imaging:" + normalize(self.modality))
+
+
+@dataclass(frozen=True, slots=True)
+class Score:
+    name: str
+    about: str = ""
+    rule_in: str = ""
+    rule_out: str = ""
+    ref: str = ""
+    key: str = ""
+
+    def __post_init__(self) -> None:
+        if not self.key:
+            object.__setattr__(self, "key", "score:" + normalize(self.name))
+
+
+Item = Union[Exam, Lab, Imaging, Score]
+
+# שדה בבלוק -> סוג הרשומה; השאר (questions/notes/aliases) הם טאפלים של טקסט
+ITEM_TYPES: Dict[str, Type[Any]] = {"physical_exam": Exam, "labs": Lab, "imaging": Imaging, "scores": Score}
+KINDS: Tuple[Type[Any], ...] = (Exam, Lab, Imaging, Score)     # קוד סוג ב-knowledge.pack = אינדקס
+_TITLE_FIELD: Dict[Type[Any], str] = {Exam: "label", Lab: "test", Imaging: "modality", Score: "name"}
+
+
+def title(item: Item) -> str:
+    """השם המוצג של פריט (label / test / modality / name)."""
+    return getattr(item, _TITLE_FIELD[type(item)])
+
+
+class Pool:
+    """מחרוזות מאונטרנות ומופע יחיד לכל פריט זהה."""
+    __slots__ = ("_items",)
+
+    def __init__(self) -> None:
+        self._items: Dict[Tuple[Any, ...], Any] = {}
+
+    def item(self, cls: Type[Any], **fields: str) -> Any:
+        values = tuple(sys.intern(fields.get(f, "") or "") for f in cls.__dataclass_fields__ if f != "key")
+        k = (cls,) + values
+        it = self._items.get(k)
+        if it is None:
+            it = self._items[k] = cls(*values)
+        return it
+
+    def block(self, blk: Dict[str, Any]) -> Dict[str, Tuple[Any, ...]]:
+        """בלוק JSON (רשימות של dict/טקסט) -> בלוק של טאפלים (רשומות/טקסט מאונטרן)."""
+        out: Dict[str, Tuple[Any, ...]] = {}
+        for field, items in blk.items():
+            cls = ITEM_TYPES.get(field)
+            if cls is None:
+                out[field] = tuple(sys.intern(x) if isinstance(x, str) else x for x in items)
+            else:
+                out[field] = tuple(self.item(cls, **it) if isinstance(it, dict) else it for it in items)
+        return out
+
+
+def as_row(item: Item) -> Tuple[Any, ...]:
+    """רשומה -> (קוד סוג, key, *שדות) לשמירה ב-knowledge.pack."""
+    values = [getattr(item, f) for f in item.__dataclass_fields__ if f != "key"]
+    return (KINDS.index(type(item)), item.key, *values)
+
+
+def from_row(row: Tuple[Any, ...]) -> Item:
+    kind, key, *values = row
+    return KINDS[kind](*values, key=key)
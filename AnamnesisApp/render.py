@@ -0,0 +1,221 @@
+"""רנדר תלונה ל-HTML מוכן מראש.
+
+כל תלונה נבנית פעם אחת לגרסת תוכן ושפה (locales.py) לכמה מקטעי HTML (כותרת+
+שאלות, שלוש עמודות, הערות+scores) ונשמרת במטמון משותף; התצוגה שולחת מקטע אחד
+לכל אזור במקום קריאת st.markdown לכל שורה.
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, FrozenSet, Tuple
+from dataclasses import dataclass
+from functools import lru_cache, singledispatch
+from html import escape
+import threading
+
+from knowledge import Content
+from lru import LRU
+from locales import SOURCE_LOCALE, Locale
+from merge import KEEP_VERSIONS, MAX_MERGED, Merged, merge_blocks, merged
+from records import Exam, Imaging, Lab, Score
+from rules import get_rules, plan_block
+
+# ========================= CSS (RTL / LTR לפי שפה) =========================
+LAYOUT_CSS = """
+.block-container{padding-top:12px;padding-bottom:20px}
+h1,h2,h3,h4{letter-spacing:.2px}
+.card{background:rgba(255,255,255,.84);border:1px solid rgba(0,0,0,.08);border-radius:14px;padding:14px 16px;margin-bottom:12px}
+@media (prefers-color-scheme:dark){.card{background:rgba(17,24,39,.85);border:1px solid rgba(255,255,255,.12)}}
+.card h4{margin-top:0}
+.card ul{margin:0;padding-inline-start:1.2em}
+.cap{font-size:.85em;opacity:.7}
+.hr{height:1px;background:linear-gradient(90deg,transparent,rgba(128,128,128,.35),transparent);margin:12px 0 18px}
+[data-testid='stSidebar']{display:none}
+"""
+
+
+@lru_cache(maxsize=None)
+def base_css(direction: str = "rtl") -> str:
+    align = "right" if direction == "rtl" else "left"
+    return (f".stApp{{direction:{direction}}}\n"
+            f"h1,h2,h3,h4,p,li,span,label,.stMarkdown{{text-align:{align}}}" + LAYOUT_CSS)
+
+
+BASE_CSS = base_css("rtl")
+
+HR = "<div class='hr'></div>"
+ADDED = "✚ לפי התשובות"         # פריט שנוסף בגלל כלל (rules.py)
+
+
+def _added(loc: Locale) -> str:
+    return f" <span class='cap'>{escape(loc.t(ADDED))}</span>"
+
+
+# ========================= מקטעים =========================
+def _card(title: str, lis: List[str], empty: str) -> str:
+    body = "".join(f"<li>{li}</li>" for li in lis) or f"<li>{empty}</li>"
+    head = f"<h4>{title}</h4>" if title else ""
+    return f"<div class='card'>{head}<ul>{body}</ul></div>"
+
+
+@singledispatch
+def _item(item: Any, loc: Locale = SOURCE_LOCALE) -> str:
+    return escape(loc.t(str(item)))
+
+
+@_item.register
+def _(item: Exam, loc: Locale = SOURCE_LOCALE) -> str:
+    label = escape(loc.t(item.label))
+    return f"▶️ <a href='{escape(item.url)}' target='_blank'>{label}</a>" if item.url else label
+
+
+@_item.register
+def _(item: Lab, loc: Locale = SOURCE_LOCALE) -> str:
+    t = loc.t
+    line = f"<b>{escape(t(item.test))}</b>"
+    if item.why:  line += f" — {t('למה')}: {escape(t(item.why))}"
+    if item.when: line += f" — {t('מתי')}: {escape(t(item.when))}"
+    return line
+
+
+@_item.register
+def _(item: Imaging, loc: Locale = SOURCE_LOCALE) -> str:
+    t = loc.t
+    return f"<b>{escape(t(item.modality))}</b>" + (f" — {t('מתי')}: {escape(t(item.trigger))}" if item.trigger else "")
+
+
+@_item.register
+def _(item: Score, loc: Locale = SOURCE_LOCALE) -> str:
+    t = loc.t
+    line = f"<b>{escape(t(item.name))}</b>" + (f" — {escape(t(item.about))}" if item.about else "")
+    for value, prefix in ((item.rule_in, "Rule-in: "), (item.rule_out, "Rule-out: "), (item.ref, "ⓘ ")):
+        if value:
+            line += f"<div class='cap'>{prefix}{escape(t(value))}</div>"
+    return line
+
+
+def questions_html(qs: List[str], loc: Locale = SOURCE_LOCALE) -> str:
+    t = loc.t
+    return _card(t(QUESTIONS_TITLE), [escape(t(q)) for q in qs], t("אין שאלות מוגדרות"))
+
+
+def items_html(items: Any, title: str, added: FrozenSet[str] = frozenset(), loc: Locale = SOURCE_LOCALE) -> str:
+    mark = _added(loc)
+    return _card(loc.t(title), [_item(it, loc) + (mark if it.key in added else "") for it in items or []],
+                 loc.t("אין פריטים"))
+
+
+QUESTIONS_TITLE = "אנמנזה - מה לשאול"
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ("physical_exam", "🧍‍♂️ מה לבדוק (בדיקה גופנית)"),
+    ("labs", "🧪 מעבדה"),
+    ("imaging", "🖥️ הדמיה"),
+)
+
+
+@dataclass(frozen=True)
+class View:
+    header: str                  # כותרת + שאלות
+    columns: Tuple[str, ...]     # בדיקה גופנית / מעבדה / הדמיה
+    footer: str                  # הערות + scores (יכול להיות ריק)
+    title: str = ""              # כותרת בלבד (כשהשאלות מוצגות כ-widgets)
+
+
+def _footer(notes: List[str], scores: List[str], loc: Locale) -> str:
+    footer = ""
+    if notes:
+        footer += f"{HR}<h4>{loc.t('🧴 הערות והמלצות')}</h4>" + _card("", notes, "")
+    if scores:
+        footer += HR + _card(loc.t("📊 SCORES רלוונטיים"), scores, "")
+    return footer
+
+
+def build_view(name: str, blk: Dict[str, Any], added: FrozenSet[str] = frozenset(),
+               loc: Locale = SOURCE_LOCALE) -> View:
+    title = f"<h3>{escape(loc.t(name))}</h3>"
+    header = title + questions_html(blk.get("questions", []), loc)
+    columns = tuple(items_html(blk.get(field, []), t, added, loc) for field, t in COLUMNS)
+    mark = _added(loc)
+    scores = [_item(s, loc) + (mark if s.key in added else "") for s in blk.get("scores", [])]
+    footer = _footer([escape(loc.t(n)) for n in blk.get("notes", [])], scores, loc)
+    return View(header, columns, footer, title)
+
+
+def build_merged_view(m: Merged, loc: Locale = SOURCE_LOCALE) -> View:
+    """כמה תלונות: כל פריט פעם אחת, עם התלונות שדרשו אותו (וסימון אם נוסף בגלל כלל)."""
+    t, mark = loc.t, _added(loc)
+
+    def lis(field: str) -> List[str]:
+        return [_item(e.item, loc)
+                + f" <span class='cap'>({' · '.join(escape(t(s)) for s in e.sources)})</span>"
+                + (mark if e.added else "")
+                for e in m.fields[field]]
+    title = f"<h3>{' + '.join(escape(t(n)) for n in m.names)}</h3>"
+    header = title + _card(t(QUESTIONS_TITLE), lis("questions"), t("אין שאלות מוגדרות"))
+    columns = tuple(_card(t(c), lis(field), t("אין פריטים")) for field, c in COLUMNS)
+    return View(header, columns, _footer(lis("notes"), lis("scores"), loc), title)
+
+
+# ========================= מטמון לפי גרסת תוכן (ושפה בתוך המפתח) =========================
+class _Cache:
+    """התצוגות של גרסת תוכן אחת."""
+    __slots__ = ("views", "merged", "plans")
+
+    def __init__(self) -> None:
+        self.views: Dict[Tuple[str, str], View] = {}
+        self.merged: LRU[View] = LRU(MAX_MERGED)
+        self.plans: LRU[View] = LRU(MAX_MERGED)
+
+
+_lock = threading.Lock()
+_caches: LRU[_Cache] = LRU(KEEP_VERSIONS)
+
+
+def _cache(content: Content) -> _Cache:
+    """המטמון של content.version - ריצה (או popular.warm) עם Content ישן לא כותבת לגרסה החדשה."""
+    cache = _caches.get(content.version)
+    if cache is None:
+        with _lock:
+            cache = _caches.get(content.version)
+            if cache is None:
+                cache = _Cache()
+                _caches.put(content.version, cache)
+    return cache
+
+
+def complaint_view(content: Content, name: str, loc: Locale = SOURCE_LOCALE) -> View:
+    views = _cache(content).views
+    key = (loc.key, name)
+    view = views.get(key)
+    if view is None:
+        view = views[key] = build_view(name, content.complaints[name], loc=loc)
+    return view
+
+
+def merged_view(content: Content, names: Tuple[str, ...], loc: Locale = SOURCE_LOCALE) -> View:
+    if len(names) == 1:
+        return complaint_view(content, names[0], loc)
+    cache = _cache(content).merged
+    key = (loc.key, names)
+    view = cache.get(key)
+    if view is None:
+        view = build_merged_view(merged(content, names), loc=loc)
+        cache.put(key, view)
+    return view
+
+
+def plan_view(content: Content, names: Tuple[str, ...], fired: Tuple[FrozenSet[int], ...],
+              loc: Locale = SOURCE_LOCALE) -> View:
+    """תוכנית בירור אחרי תשובות: fired = הכללים שהופעלו לכל תלונה (rules.Answers)."""
+    if not any(fired):
+        return merged_view(content, names, loc)
+    cache = _cache(content).plans
+    key = (loc.key, names, fired)
+    view = cache.get(key)
+    if view is None:
+        idx = get_rules(content)
+        plans = [plan_block(content, idx, n, f) for n, f in zip(names, fired)]
+        if len(names) == 1:
+            view = build_view(names[0], plans[0][0], plans[0][1], loc)
+        else:
+            view = build_merged_view(merge_blocks(names, [b for b, _ in plans], [a for _, a in plans]), loc)
+        cache.put(key, view)
+    return view
@@ -0,0 +1,208 @@
+"""אנמנזה אינטראקטיבית: תשובות לשאלות -> כללים -> תוכנית בירור מעודכנת.
+
+כללים בשדה rules של תלונה ב-knowledge.json:
+    {"when": {"q": "חום/צמרמורת/כיח", "is": "yes"}, "add": {"labs": [{"test": "תרביות דם x2"}]}}
+    {"when": [{"q": "גיל", ">=": 65}, ...], "remove": {"imaging": ["MRI/CT"]}}
+
+"q" הוא טקסט השאלה כפי שהוא ב-questions (כמו label ב-video_links.json). כמה
+תנאים ב-when = וגם. שאלה שמופיעה בתנאי מספרי מקבלת שדה מספר; כל השאר כן/לא.
+remove מנצח add; פריטים לפי key (records.py), כך ש-"MRI/CT" מוסר גם אם נכתב אחרת.
+כלל פגום (למשל מעדכון מגיליון) נרשם ללוג ומדולג - לא מפיל את התצוגה.
+
+הכללים מקומפלים פעם אחת לגרסת תוכן לטבלאות: שאלה -> הכללים שתלויים בה.
+שינוי תשובה מחשב מחדש רק את הכללים האלה (Answers.answer), והתוכנית
+לכל צירוף כללים שהופעלו נבנית פעם אחת ונשמרת במטמון.
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, FrozenSet, Optional, Tuple
+from dataclasses import dataclass, field
+import logging
+import operator
+import threading
+
+from knowledge import Content, attach_video_links
+from records import ITEM_TYPES, Item, Pool
+from textnorm import normalize
+
+log = logging.getLogger(__name__)
+
+YES, NO = "yes", "no"
+COMPARE = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt}
+
+Cond = Tuple[str, str, Any]         # (שאלה מנורמלת, אופרטור, ערך); אופרטור "is" = כן/לא
+
+
+@dataclass(frozen=True)
+class Rule:
+    when: Tuple[Cond, ...]
+    add: Dict[str, Tuple[Item, ...]]
+    remove: Dict[str, FrozenSet[str]]          # שדה -> keys
+
+
+@dataclass(frozen=True)
+class RuleSet:
+    rules: Tuple[Rule, ...]
+    deps: Dict[str, Tuple[int, ...]]           # שאלה -> אינדקסי הכללים שתלויים בה
+
+
+def conditions(rule: Dict[str, Any]) -> List[Dict[str, Any]]:
+    when = rule.get("when", [])
+    return [when] if isinstance(when, dict) else list(when)
+
+
+def _cond(c: Dict[str, Any]) -> Cond:
+    q = normalize(c["q"])
+    if "is" in c:
+        return q, "is", c["is"]
+    op = next((k for k in COMPARE if k in c), None)
+    if op is None:
+        raise ValueError(f"{c['q']!r}: אין אופרטור מוכר ({', '.join(['is', *COMPARE])})")
+    return q, op, float(c[op])
+
+
+def _holds(cond: Cond, answers: Dict[str, Any]) -> bool:
+    q, op, value = cond
+    a = answers.get(q)
+    if a is None:
+        return False
+    if op == "is":
+        return a == value
+    return COMPARE[op](a, value)
+
+
+def _compile(r: Dict[str, Any], pool: Pool, content: Content) -> Rule:
+    when = tuple(_cond(c) for c in conditions(r))
+    if not when:
+        raise ValueError("when ריק")
+    add_raw = {f: [dict(it) for it in items] for f, items in r.get("add", {}).items()}
+    attach_video_links(add_raw, content.video_map)
+    add = {f: tuple(pool.item(ITEM_TYPES[f], **it) for it in items) for f, items in add_raw.items()}
+    remove = {f: frozenset(ITEM_TYPES[f](t).key for t in titles)
+              for f, titles in r.get("remove", {}).items()}
+    return Rule(when, add, remove)
+
+
+class RuleIndex:
+    """כל הכללים של גרסת תוכן אחת, מקומפלים."""
+    __slots__ = ("version", "sets", "kinds", "users")
+
+    def __init__(self, content: Content) -> None:
+        self.version = content.version
+        pool = Pool()
+        self.sets: Dict[str, RuleSet] = {}
+        self.kinds: Dict[str, str] = {}                # שאלה -> "value" (שדה מספר) / "yesno"
+        users: Dict[str, List[str]] = {}               # שאלה -> תלונות שיש להן כלל שתלוי בה
+        for name in content.names:
+            raw = content.complaints[name].get("rules", ())
+            if not raw:
+                continue
+            rules: List[Rule] = []
+            deps: Dict[str, List[int]] = {}
+            for j, r in enumerate(raw):
+                try:
+                    rule = _compile(r, pool, content)
+                except (KeyError, TypeError, ValueError, AttributeError) as e:
+                    log.warning("rule %s[%d] skipped: %s", name, j, e)
+                    continue
+                i = len(rules)
+                rules.append(rule)
+                for q, op, _ in rule.when:
+                    if i not in deps.setdefault(q, []):
+                        deps[q].append(i)
+                    if op == "is":
+                        self.kinds.setdefault(q, "yesno")
+                    else:
+                        self.kinds[q] = "value"
+                    if name not in users.setdefault(q, []):
+                        users[q].append(name)
+            self.sets[name] = RuleSet(tuple(rules), {q: tuple(ix) for q, ix in deps.items()})
+        self.users: Dict[str, Tuple[str, ...]] = {q: tuple(ns) for q, ns in users.items()}
+
+    def evaluate(self, name: str, answers: Dict[str, Any]) -> FrozenSet[int]:
+        """כל הכללים של תלונה (פעם אחת, כשהתלונה נבחרת)."""
+        rs = self.sets.get(name)
+        if rs is None:
+            return frozenset()
+        return frozenset(i for i, r in enumerate(rs.rules) if all(_holds(c, answers) for c in r.when))
+
+
+@dataclass
+class Answers:
+    """תשובות של סשן (st.session_state) + הכללים שהופעלו לכל תלונה."""
+    version: str = ""
+    answers: Dict[str, Any] = field(default_factory=dict)
+    fired: Dict[str, FrozenSet[int]] = field(default_factory=dict)
+
+    def sync(self, idx: RuleIndex) -> None:
+        if self.version != idx.version:           # תוכן חדש: אינדקסים של כללים השתנו, התשובות נשמרות
+            self.version, self.fired = idx.version, {}
+
+    def fired_for(self, idx: RuleIndex, name: str) -> FrozenSet[int]:
+        f = self.fired.get(name)
+        if f is None:
+            f = self.fired[name] = idx.evaluate(name, self.answers)
+        return f
+
+    def answer(self, idx: RuleIndex, question: str, value: Any) -> None:
+        """מעדכן תשובה ומחשב מחדש רק כללים שתלויים בשאלה הזו."""
+        q = normalize(question)
+        if value is None:
+            self.answers.pop(q, None)
+        else:
+            self.answers[q] = value
+        self.sync(idx)
+        for name in idx.users.get(q, ()):
+            old = self.fired.get(name)
+            if old is None:                       # תלונה שעוד לא הוצגה: תחושב כשתיבחר
+                continue
+            rs = idx.sets[name]
+            f = set(old)
+            for i in rs.deps[q]:
+                if all(_holds(c, self.answers) for c in rs.rules[i].when):
+                    f.add(i)
+                else:
+                    f.discard(i)
+            self.fired[name] = frozenset(f)
+
+    def clear(self) -> None:
+        self.answers.clear()
+        self.fired.clear()
+
+
+# ========================= תוכנית בירור =========================
+def plan_block(content: Content, idx: RuleIndex, name: str,
+               fired: FrozenSet[int]) -> Tuple[Dict[str, Tuple[Any, ...]], FrozenSet[str]]:
+    """הבלוק של התלונה אחרי הכללים שהופעלו + keys של פריטים שנוספו בגללם."""
+    blk = content.complaints[name]
+    if not fired:
+        return blk, frozenset()
+    rules = [idx.sets[name].rules[i] for i in sorted(fired)]
+    out = dict(blk)
+    added: List[str] = []
+    for f in ITEM_TYPES:
+        removed = frozenset().union(*(r.remove.get(f, ()) for r in rules))
+        items = [it for it in blk.get(f, ()) if it.key not in removed]
+        keys = {it.key for it in items}
+        for r in rules:
+            for it in r.add.get(f, ()):
+                if it.key not in keys and it.key not in removed:
+                    keys.add(it.key)
+                    items.append(it)
+                    added.append(it.key)
+        out[f] = tuple(items)
+    return out, frozenset(added)
+
+
+_lock = threading.Lock()
+_index: Optional[RuleIndex] = None
+
+
+def get_rules(content: Content) -> RuleIndex:
+    global _index
+    idx = _index
+    if idx is None or idx.version != content.version:
+        with _lock:
+            if _index is None or _index.version != content.version:
+                _index = RuleIndex(content)
+            idx = _index
+    return idx
@@ -0,0 +1,240 @@
+"""מנוע scores: הגדרות מכונה-קריאות + חישוב וקטורי.
+
+    from scores_engine import score_frame
+    score_frame(visits_df, "heart")     # DataFrame: points, band, complete (אותו index)
+
+    python scores_engine.py visits.csv --scores heart,qsofa --out scored.csv
+
+כל score הוא רשימת קריטריונים; כל קריטריון קורא עמודה אחת (שמות עמודות
+משותפים בין scores - age, sbp, rr וכו', כך שטבלת ביקורים אחת מחושבת לכל
+ה-scores). החישוב הוא פעולות numpy על עמודות שלמות - בלי לולאה על שורות -
+ומשמש גם את המחשבון בתצוגת התלונה (שורה אחת).
+
+ערך חסר (NaN) = הקריטריון לא מתקיים; העמודה complete מסמנת שורות שכל הקלטים בהן קיימים.
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+from dataclasses import dataclass
+import argparse
+import operator
+import sys
+
+import numpy as np
+
+from textnorm import normalize
+
+OPS = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt}
+
+Cond = Tuple[str, str, float]       # (עמודה, אופרטור, סף)
+
+# תוויות לעמודות שמופיעות רק כתנאי חלופי (alt)
+COLUMN_LABELS = {"dbp": "לחץ דם דיאסטולי"}
+
+
+@dataclass(frozen=True)
+class Criterion:
+    column: str
+    label: str
+    kind: str = "flag"                              # flag | threshold | choice
+    points: float = 1                               # flag: נקודות אם מתקיים
+    op: str = ">="                                  # threshold
+    tiers: Tuple[Tuple[float, float], ...] = ()     # threshold: (סף, נקודות); סף מאוחר גובר
+    alt: Tuple[Cond, ...] = ()                      # threshold: תנאים חלופיים (OR) -> נקודות הדרגה האחרונה
+    options: Tuple[str, ...] = ()                   # choice: אינדקס האפשרות = נקודות
+    unit: str = ""
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return (self.column, *(c for c, _, _ in self.alt))
+
+
+@dataclass(frozen=True)
+class ScoreDef:
+    key: str
+    name: str
+    criteria: Tuple[Criterion, ...]
+    bands: Tuple[Tuple[float, str], ...]            # (ערך מינימלי, פירוש), בסדר עולה
+    match: Tuple[str, ...] = ()                     # ביטויים לזיהוי שם score בתלונה (אחרי נרמול)
+    ref: str = ""
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return tuple(dict.fromkeys(c for cr in self.criteria for c in cr.columns))
+
+
+def _flag(column: str, label: str, points: float = 1) -> Criterion:
+    return Criterion(column, label, "flag", points)
+
+
+def _num(column: str, label: str, op: str, *tiers: Tuple[float, float], alt: Tuple[Cond, ...] = (),
+         unit: str = "") -> Criterion:
+    return Criterion(column, label, "threshold", op=op, tiers=tiers, alt=alt, unit=unit)
+
+
+def _choice(column: str, label: str, *options: str) -> Criterion:
+    return Criterion(column, label, "choice", options=options)
+
+
+# ========================= הגדרות =========================
+SCORES: Dict[str, ScoreDef] = {d.key: d for d in (
+    ScoreDef("heart", "HEART", (
+        _choice("heart_history", "History", "חשד נמוך", "חשד בינוני", "חשד גבוה"),
+        _choice("heart_ecg", "ECG", "תקין", "הפרעת רה-פולריזציה לא ספציפית", "שקיעות ST משמעותיות"),
+        _num("age", "גיל", ">=", (45, 1), (65, 2), unit="שנים"),
+        _choice("heart_risk", "גורמי סיכון", "אין", "1-2 גורמי סיכון", "3+ או מחלה טרשתית ידועה"),
+        _choice("heart_troponin", "טרופונין", "≤ גבול עליון", "1-3× גבול עליון", ">3× גבול עליון"),
+    ), ((0, "סיכון נמוך"), (4, "סיכון בינוני"), (7, "סיכון גבוה")), ("heart",),
+        "Six AJ et al. Neth Heart J 2008"),
+    ScoreDef("wells_pe", "Wells - PE", (
+        _flag("dvt_signs", "סימנים קליניים של DVT", 3),
+        _flag("pe_most_likely", "PE האבחנה הסבירה ביותר", 3),
+        _num("hr", "דופק", ">", (100, 1.5), unit="לדקה"),
+        _flag("immobilization", "אימוביליזציה ≥3 ימים / ניתוח ב-4 שבועות", 1.5),
+        _flag("prior_vte", "DVT/PE בעבר", 1.5),
+        _flag("hemoptysis", "המופטיזיס", 1),
+        _flag("malignancy", "ממאירות פעילה", 1),
+    ), ((0, "PE לא סביר"), (4.5, "PE סביר")), ("wells pe",), "Wells PS et al. Thromb Haemost 2000"),
+    ScoreDef("wells_dvt", "Wells DVT", (
+        _flag("malignancy", "ממאירות פעילה"),
+        _flag("paralysis", "שיתוק/פרזיס/גבס ברגל"),
+        _flag("bedridden", "ריתוק ≥3 ימים / ניתוח ב-12 שבועות"),
+        _flag("vein_tenderness", "רגישות לאורך ורידים עמוקים"),
+        _flag("leg_swollen", "נפיחות של כל הרגל"),
+        _flag("calf_swelling", "הפרש היקף שוק ≥3 ס\"מ"),
+        _flag("pitting_edema", "בצקת גומתית ברגל הסימפטומטית"),
+        _flag("collateral_veins", "ורידים שטחיים קולטרליים"),
+        _flag("prior_vte", "DVT בעבר"),
+        _flag("alt_dx_likely", "אבחנה חלופית סבירה לפחות באותה מידה", -2),
+    ), ((-2, "DVT לא סביר"), (2, "DVT סביר")), ("wells dvt",), "Wells PS et al. NEJM 2003"),
+    ScoreDef("qsofa", "qSOFA", (
+        _num("rr", "קצב נשימה", ">=", (22, 1), unit="לדקה"),
+        _flag("altered_mentation", "שינוי במצב ההכרה"),
+        _num("sbp", "לחץ דם סיסטולי", "<=", (100, 1), unit="מ\"מ כספית"),
+    ), ((0, "סיכון נמוך"), (2, "סיכון גבוה לתמותה")), ("qsofa",), "Seymour CW et al. JAMA 2016"),
+    ScoreDef("curb65", "CURB-65", (
+        _flag("altered_mentation", "בלבול"),
+        _num("urea_mmol", "אוריאה", ">", (7, 1), unit="mmol/L"),
+        _num("rr", "קצב נשימה", ">=", (30, 1), unit="לדקה"),
+        _num("sbp", "לחץ דם סיסטולי <90 (או דיאסטולי ≤60)", "<", (90, 1), alt=(("dbp", "<=", 60),),
+             unit="מ\"מ כספית"),
+        _num("age", "גיל", ">=", (65, 1), unit="שנים"),
+    ), ((0, "נמוך - טיפול בקהילה"), (2, "בינוני - שקול אשפוז"), (3, "גבוה - אשפוז, שקול טיפול נמרץ")),
+        ("curb 65",), "Lim WS et al. Thorax 2003"),
+    ScoreDef("cha2ds2vasc", "CHA₂DS₂-VASc", (
+        _flag("chf", "אי-ספיקת לב"),
+        _flag("hypertension", "יתר לחץ דם"),
+        _num("age", "גיל", ">=", (65, 1), (75, 2), unit="שנים"),
+        _flag("diabetes", "סוכרת"),
+        _flag("stroke_tia", "שבץ/TIA/תסחיף בעבר", 2),
+        _flag("vascular", "מחלה וסקולרית"),
+        _flag("female", "מין נקבה"),
+    ), ((0, "סיכון נמוך"), (1, "סיכון בינוני"), (2, "גבוה - שקול נוגדי קרישה")),
+        ("cha2ds2 vasc", "chads2 vasc"), "Lip GY et al. Chest 2010"),
+)}
+
+
+def find(score_name: str) -> Optional[ScoreDef]:
+    """שם score מתלונה ("Wells/PERC ל-PE", "CHADS2-VASc") -> הגדרה ניתנת לחישוב, אם יש."""
+    words = set(normalize(score_name).split())
+    for d in SCORES.values():
+        if any(set(m.split()) <= words for m in d.match):
+            return d
+    return None
+
+
+def get(score: str | ScoreDef) -> ScoreDef:
+    if isinstance(score, ScoreDef):
+        return score
+    d = SCORES.get(score) or find(score)
+    if d is None:
+        raise KeyError(f"score לא מוכר: {score!r} (קיימים: {', '.join(SCORES)})")
+    return d
+
+
+# ========================= חישוב וקטורי =========================
+def evaluate(defn: ScoreDef, cols: Mapping[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """עמודות float (NaN = חסר) -> (נקודות, אינדקס band, complete) לכל שורה."""
+    n = len(next(iter(cols.values()))) if cols else 0
+    total = np.zeros(n)
+    complete = np.ones(n, dtype=bool)
+    for cr in defn.criteria:
+        x = cols[cr.column]
+        present = ~np.isnan(x)
+        if cr.kind == "flag":
+            total += np.where(present & (x != 0), cr.points, 0.0)
+        elif cr.kind == "choice":
+            total += np.clip(np.nan_to_num(x), 0, len(cr.options) - 1)
+        else:
+            pts = np.zeros(n)
+            with np.errstate(invalid="ignore"):
+                for threshold, p in cr.tiers:
+                    pts = np.where(OPS[cr.op](x, threshold), p, pts)
+                for column, op, threshold in cr.alt:
+                    y = cols[column]
+                    pts = np.where(OPS[op](y, threshold), np.maximum(pts, cr.tiers[-1][1]), pts)
+                    present |= ~np.isnan(y)
+            total += pts
+        complete &= present
+    edges = np.array([b for b, _ in defn.bands[1:]])
+    return total, np.searchsorted(edges, total, side="right"), complete
+
+
+def score_values(score: str | ScoreDef, values: Mapping[str, Any]) -> Tuple[float, str]:
+    """שורה אחת (מחשבון): {עמודה: ערך} -> (נקודות, פירוש)."""
+    defn = get(score)
+    cols = {c: np.array([np.nan if values.get(c) is None else float(values[c])]) for c in defn.columns}
+    total, band, _ = evaluate(defn, cols)
+    return float(total[0]), defn.bands[int(band[0])][1]
+
+
+def score_frame(df: Any, score: str | ScoreDef) -> Any:
+    """DataFrame של ביקורים -> DataFrame עם points, band, complete (אותו index)."""
+    import pandas as pd
+    defn = get(score)
+    missing = [c for c in defn.columns if c not in df.columns]
+    if missing:
+        raise KeyError(f"{defn.name}: עמודות חסרות: {', '.join(missing)}")
+    cols = {c: pd.to_numeric(df[c], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            for c in defn.columns}
+    total, band, complete = evaluate(defn, cols)
+    labels = pd.Categorical.from_codes(band, [label for _, label in defn.bands])
+    return pd.DataFrame({"points": total, "band": labels, "complete": complete}, index=df.index)
+
+
+def score_all(df: Any, scores: Optional[List[str]] = None) -> Any:
+    """כל ה-scores שיש להם עמודות ב-df (או הרשימה שניתנה), עמודות עם קידומת: heart_points, ..."""
+    import pandas as pd
+    defs = [get(s) for s in scores] if scores else \
+        [d for d in SCORES.values() if all(c in df.columns for c in d.columns)]
+    return pd.concat([score_frame(df, d).add_prefix(f"{d.key}_") for d in defs], axis=1)
+
+
+# ========================= CLI =========================
+def main(argv: List[str] | None = None) -> int:
+    import pandas as pd
+    ap = argparse.ArgumentParser(description="חישוב scores לטבלת ביקורים (CSV/XLSX)")
+    ap.add_argument("path")
+    ap.add_argument("--scores", default="", help=f"רשימה מופרדת בפסיקים ({','.join(SCORES)}); ברירת מחדל: כל מה שאפשר")
+    ap.add_argument("--out", default="", help="קובץ CSV לתוצאה (ברירת מחדל: סיכום בלבד)")
+    args = ap.parse_args(argv)
+    df = pd.read_excel(args.path) if args.path.endswith((".xlsx", ".xls")) else pd.read_csv(args.path)
+    names = [s.strip() for s in args.scores.split(",") if s.strip()]
+    try:
+        result = score_all(df, names or None)
+    except KeyError as e:
+        print(f"שגיאה: {e.args[0]}", file=sys.stderr)
+        return 1
+    if result.empty:
+        print("אין score שכל העמודות שלו קיימות בקובץ", file=sys.stderr)
+        return 1
+    for col in result.columns:
+        if col.endswith("_band"):
+            print(f"{col[:-5]}:", ", ".join(f"{k} {v}" for k, v in result[col].value_counts(sort=False).items()))
+    if args.out:
+        pd.concat([df, result], axis=1).to_csv(args.out, index=False)
+        print(f"{args.out}: {len(result)} שורות")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
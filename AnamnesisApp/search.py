@@ -0,0 +1,125 @@
+"""חיפוש עמום (fuzzy) בתלונות: שם, aliases וטקסט השאלות.
+
+האינדקס נבנה פעם אחת לכל גרסת תוכן ושפה (locales.py) ומשותף לכל הסשנים; כל
+מילה בחיפוש היא קריאת batch אחת ל-rapidfuzz (C) מול אוצר מילים מנורמל מראש.
+בשפה שאינה המקור מאונדקסים גם השם המקורי וה-aliases, כך שחיפוש בעברית עובד בכל שפה.
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+from bisect import bisect_left
+import threading
+
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+
+from knowledge import Content
+from locales import SOURCE_LOCALE, Locale
+from textnorm import normalize
+
+# ========================= אינדקס =========================
+# משקל לפי מקור ההתאמה: שם/alias חשובים יותר מטקסט שאלה
+W_NAME, W_ALIAS, W_QUESTION = 1.0, 0.95, 0.7
+PREFIXES = "והבכלמש"                    # אותיות שימוש: "לשבץ" מאונדקס גם כ-"שבץ"
+
+
+def max_edits(word: str) -> int:
+    """שגיאות הקלדה מותרות לפי אורך: במילים קצרות (ראש, גב, חום) ratio של אות
+    אחת שגויה נופל מתחת לכל סף אחוזים, לכן הסף הוא מספר עריכות."""
+    n = len(word)
+    return 0 if n < 3 else 1 if n <= 4 else 2
+
+
+class SearchIndex:
+    """אינדקס מילים: אוצר מילים ייחודי (קטן בהרבה ממספר הטקסטים) + postings.
+
+    כל מילה בשאילתה מושווית ב-batch אחד של rapidfuzz מול אוצר המילים,
+    ורק הטקסטים שמכילים מילים תואמות מקבלים ציון.
+    """
+    __slots__ = ("version", "_names", "_vocab", "_sorted", "_postings", "_owners", "_weights", "_sizes")
+
+    def __init__(self, content: Content, loc: Locale = SOURCE_LOCALE) -> None:
+        self.version = (content.version, loc.key)
+        t = loc.t
+        self._names = content.names
+        vocab: Dict[str, int] = {}
+        postings: List[List[int]] = []
+        owners: List[int] = []
+        weights: List[float] = []
+        sizes: List[int] = []
+        seen: set = set()
+        for i, name in enumerate(content.names):
+            blk = content.complaints[name]
+            for text, w in ([(t(name), W_NAME), (name, W_ALIAS)]
+                            + [(a, W_ALIAS) for a in (*blk.get("aliases", ()), *loc.aliases.get(name, ()))]
+                            + [(t(q), W_QUESTION) for q in blk.get("questions", [])]):
+                words = set(normalize(text).split())
+                if not words or (frozenset(words), i) in seen:
+                    continue
+                seen.add((frozenset(words), i))
+                entry = len(owners)
+                owners.append(i); weights.append(w); sizes.append(len(words))
+                for word in words | {x[1:] for x in words if len(x) >= 4 and x[0] in PREFIXES}:
+                    if word not in vocab:
+                        vocab[word] = len(postings); postings.append([])
+                    postings[vocab[word]].append(entry)
+        self._vocab: List[str] = list(vocab)
+        self._sorted = sorted(range(len(self._vocab)), key=self._vocab.__getitem__)
+        self._postings = postings
+        self._owners, self._weights, self._sizes = owners, weights, sizes
+
+    def _word_hits(self, word: str) -> Dict[int, float]:
+        """מילה בשאילתה -> {מילה באוצר: ציון}; עד max_edits עריכות, התחלת מילה (הקלדה חלקית) = 100."""
+        vocab = self._vocab
+        hits = {idx: 100.0 * (1.0 - dist / max(len(word), len(vocab[idx]))) for _, dist, idx in process.extract(
+            word, vocab, scorer=Levenshtein.distance, processor=None, score_cutoff=max_edits(word), limit=64)}
+        if len(word) >= 2:
+            order = self._sorted
+            lo = bisect_left(order, word, key=vocab.__getitem__)
+            while lo < len(order) and vocab[order[lo]].startswith(word):
+                hits[order[lo]] = 100.0; lo += 1
+        return hits
+
+    def search(self, query: str, limit: int = 15, min_score: float = 40.0) -> List[Tuple[str, float]]:
+        """[(שם תלונה, ציון 0-100)] ממוין מהטוב לגרוע."""
+        words = normalize(query).split()
+        if not words:
+            return []
+        # לכל טקסט: סכום הציון הטוב ביותר לכל מילה בשאילתה + כמה מילים תאמו במדויק
+        totals: Dict[int, float] = {}
+        exact: Dict[int, int] = {}
+        for word in words:
+            per_entry: Dict[int, float] = {}
+            for v, score in self._word_hits(word).items():
+                for entry in self._postings[v]:
+                    if score > per_entry.get(entry, 0.0):
+                        per_entry[entry] = score
+            for entry, score in per_entry.items():
+                totals[entry] = totals.get(entry, 0.0) + score
+                exact[entry] = exact.get(entry, 0) + (score == 100.0)
+        best: Dict[int, Tuple[float, int]] = {}
+        n = len(words)
+        for entry, total in totals.items():
+            # כיסוי השאילתה * משקל המקור, עם קנס קטן לטקסטים ארוכים
+            score = total / n * self._weights[entry] * (1.0 - 0.02 * max(0, self._sizes[entry] - n))
+            owner = self._owners[entry]
+            if score >= min_score and (score, exact[entry]) > best.get(owner, (0.0, 0)):
+                best[owner] = (score, exact[entry])
+        # שוויון בציון: קודם מי שמילים רבות יותר שלו תאמו במדויק, ורק אז לפי שם
+        ranked = sorted(best.items(), key=lambda kv: (-kv[1][0], -kv[1][1], kv[0]))[:limit]
+        return [(self._names[i], round(s, 1)) for i, (s, _) in ranked]
+
+
+_lock = threading.Lock()
+_indexes: Dict[str, SearchIndex] = {}          # שפה -> אינדקס; רק שפות שבשימוש
+
+
+def get_index(content: Content, loc: Locale = SOURCE_LOCALE) -> SearchIndex:
+    """האינדקס לגרסת התוכן והשפה (נבנה מחדש רק כשאחת מהן משתנה)."""
+    version = (content.version, loc.key)
+    idx = _indexes.get(loc.code)
+    if idx is None or idx.version != version:
+        with _lock:
+            idx = _indexes.get(loc.code)
+            if idx is None or idx.version != version:
+                idx = _indexes[loc.code] = SearchIndex(content, loc)
+    return idx
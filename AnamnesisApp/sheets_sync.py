@@ -0,0 +1,234 @@
+"""סנכרון תוכן מ-Google Sheets ברקע.
+
+שורה בגיליון = תלונה. עמודות: name, aliases, questions, physical_exam, labs,
+imaging, scores, notes, rules. כל ערך בשורה נפרדת בתוך התא; שדות של פריט מופרדים
+ב-" | " (למשל labs: "טרופונין | אבחנת ACS | מידי"); ב-rules כל שורה היא כלל JSON (rules.py). שורה בגיליון דורסת תלונה
+באותו שם מ-knowledge.json; מחיקת השורה מחזירה את הגרסה מהקובץ.
+
+Thread ברקע מושך את הגיליון כל interval שניות, משווה hash לכל שורה מול
+הסנכרון הקודם ומחיל רק תלונות שהשתנו (knowledge.apply_overlay). snapshot
+מקומי (sheet_snapshot.json) נטען באתחול, כך שהפעלה קרה לא מחכה לרשת.
+
+הגדרה (משתני סביבה):
+    ANAMNESIS_SHEET_KEY        מפתח הגיליון (gspread + st.secrets["gcp_service_account"])
+    ANAMNESIS_SHEET_WORKSHEET  שם הלשונית (ברירת מחדל: complaints)
+    ANAMNESIS_SHEET_FILE       קובץ CSV/JSON מקומי במקום הגיליון (בדיקות/פיתוח)
+    ANAMNESIS_SHEET_INTERVAL   שניות בין סנכרונים (ברירת מחדל: 60)
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Optional, Protocol, Tuple
+import csv
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import knowledge
+from build_knowledge import validate
+
+log = logging.getLogger(__name__)
+
+SNAPSHOT_PATH = os.path.join(knowledge.BASE_DIR, "sheet_snapshot.json")
+COLUMNS = ("name", "aliases", "questions", "physical_exam", "labs", "imaging", "scores", "notes", "rules")
+ITEM_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "physical_exam": ("label", "url"),
+    "labs": ("test", "why", "when"),
+    "imaging": ("modality", "trigger"),
+    "scores": ("name", "about", "rule_in", "rule_out", "ref"),
+}
+
+
+# ========================= מקורות =========================
+class SheetSource(Protocol):
+    def fetch_rows(self) -> List[Dict[str, str]]: ...
+
+
+class GspreadSource:
+    """הגיליון האמיתי. gspread/google-auth נטענים רק כאן."""
+
+    def __init__(self, key: str, worksheet: str = "complaints",
+                 credentials: Optional[Dict[str, Any]] = None) -> None:
+        self.key, self.worksheet, self.credentials = key, worksheet, credentials
+        self._ws: Any = None
+
+    def fetch_rows(self) -> List[Dict[str, str]]:
+        if self._ws is None:
+            import gspread
+            client = gspread.service_account_from_dict(self.credentials) if self.credentials \
+                else gspread.service_account()
+            self._ws = client.open_by_key(self.key).worksheet(self.worksheet)
+        return [{k: str(v) for k, v in r.items()} for r in self._ws.get_all_records()]
+
+
+class FileSource:
+    """תחליף מקומי לגיליון: CSV עם אותן עמודות, או JSON של רשימת שורות."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def fetch_rows(self) -> List[Dict[str, str]]:
+        with open(self.path, encoding="utf-8-sig", newline="") as f:
+            if self.path.endswith(".json"):
+                return json.load(f)
+            return list(csv.DictReader(f))
+
+
+# ========================= שורה -> בלוק =========================
+def _lines(cell: Any) -> List[str]:
+    return [ln.strip() for ln in str(cell or "").splitlines() if ln.strip()]
+
+
+def _json(line: str) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return line             # validate() ידווח שזה לא אובייקט
+
+
+def row_to_block(row: Dict[str, str]) -> Tuple[str, Dict[str, Any]]:
+    name = str(row.get("name", "")).strip()
+    blk: Dict[str, Any] = {}
+    for col in COLUMNS[1:]:
+        values = _lines(row.get(col))
+        if not values:
+            continue
+        fields = ITEM_COLUMNS.get(col)
+        if col == "rules":
+            blk[col] = [_json(line) for line in values]
+        elif fields is None:
+            blk[col] = values
+        else:
+            blk[col] = [{f: v for f, v in zip(fields, (p.strip() for p in line.split("|"))) if v}
+                        for line in values]
+    return name, blk
+
+
+def row_hash(row: Dict[str, str]) -> str:
+    canon = json.dumps({c: str(row.get(c, "")) for c in COLUMNS}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()[:16]
+
+
+def _revision(hashes: Dict[str, str]) -> str:
+    return hashlib.sha256("".join(f"{n}\0{h}\n" for n, h in sorted(hashes.items())).encode()).hexdigest()[:16]
+
+
+# ========================= סנכרון =========================
+class SheetSync:
+    def __init__(self, source: SheetSource, interval: float = 60.0,
+                 snapshot_path: str = SNAPSHOT_PATH) -> None:
+        self.source, self.interval, self.snapshot_path = source, interval, snapshot_path
+        self._hashes: Dict[str, str] = {}
+        self._rows: Dict[str, Dict[str, str]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error = ""
+
+    # --- snapshot מקומי ---
+    def load_snapshot(self) -> int:
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                rows = json.load(f).get("rows", [])
+        except (FileNotFoundError, ValueError):
+            return 0
+        return self.apply_rows(rows, save=False)
+
+    def _save_snapshot(self) -> None:
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"revision": _revision(self._hashes), "rows": list(self._rows.values())},
+                      f, ensure_ascii=False)
+        os.replace(tmp, self.snapshot_path)
+
+    # --- diff + apply ---
+    def apply_rows(self, rows: List[Dict[str, str]], save: bool = True) -> int:
+        """מחיל רק שורות שה-hash שלהן השתנה (ושורות שנמחקו). מחזיר מספר תלונות שעודכנו."""
+        hashes: Dict[str, str] = {}
+        by_name: Dict[str, Dict[str, str]] = {}
+        changes: Dict[str, Optional[Dict[str, Any]]] = {}
+        video_map = knowledge.get_content().video_map
+        for row in rows:
+            name, blk = row_to_block(row)
+            if not name:
+                continue
+            h = row_hash(row)
+            if self._hashes.get(name) == h:
+                hashes[name], by_name[name] = h, row
+                continue
+            errors, _ = validate({name: blk}, dict(video_map))
+            if errors:
+                log.warning("sheet row %r skipped: %s", name, "; ".join(errors))
+                if name in self._hashes:          # שומרים את הגרסה הקודמת והתקינה
+                    hashes[name], by_name[name] = self._hashes[name], self._rows[name]
+                continue
+            hashes[name], by_name[name] = h, row
+            changes[name] = blk
+        for name in self._hashes.keys() - hashes.keys():
+            changes[name] = None
+        if changes:
+            knowledge.apply_overlay(changes, _revision(hashes))
+        self._hashes, self._rows = hashes, by_name
+        if changes and save:
+            self._save_snapshot()
+        return len(changes)
+
+    def sync_once(self) -> int:
+        try:
+            n = self.apply_rows(self.source.fetch_rows())
+            self.last_error = ""
+            return n
+        except Exception as e:        # רשת/הרשאות: ממשיכים עם התוכן הקיים
+            self.last_error = f"{type(e).__name__}: {e}"
+            log.warning("sheet sync failed: %s", self.last_error)
+            return 0
+
+    # --- thread ---
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sync_once()
+            self._stop.wait(self.interval)
+
+    def start(self) -> "SheetSync":
+        self.load_snapshot()
+        self._thread = threading.Thread(target=self._run, name="sheet-sync", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+# ========================= singleton לתהליך =========================
+_lock = threading.Lock()
+_sync: Optional[SheetSync] = None
+
+
+def source_from_env() -> Optional[SheetSource]:
+    path = os.environ.get("ANAMNESIS_SHEET_FILE")
+    if path:
+        return FileSource(path)
+    key = os.environ.get("ANAMNESIS_SHEET_KEY")
+    if not key:
+        return None
+    credentials = None
+    try:
+        import streamlit as st
+        if "gcp_service_account" in st.secrets:
+            credentials = dict(st.secrets["gcp_service_account"])
+    except Exception:
+        pass
+    return GspreadSource(key, os.environ.get("ANAMNESIS_SHEET_WORKSHEET", "complaints"), credentials)
+
+
+def start_from_env() -> Optional[SheetSync]:
+    """מפעיל סנכרון פעם אחת לתהליך אם הוגדר מקור; קריאות נוספות זולות."""
+    global _sync
+    if _sync is not None:
+        return _sync
+    with _lock:
+        if _sync is None:
+            source = source_from_env()
+            if source is None:
+                return None
+            _sync = SheetSync(source, float(os.environ.get("ANAMNESIS_SHEET_INTERVAL", "60"))).start()
+    return _sync
@@ -0,0 +1,14 @@
+"""נרמול טקסט עברי להשוואה (חיפוש, מפתחות פריטים)."""
+from __future__ import annotations
+import re
+
+# ========================= נרמול עברית =========================
+_NIQQUD = re.compile(r"[֑-ֽֿ-ׇ]")            # ניקוד וטעמים (בלי מקף)
+_FINALS = str.maketrans("ךםןףץ", "כמנפצ")
+_PUNCT = re.compile(r"[\s\-–—_/\\|,.;:!?()\[\]{}'\"`׳״־+•·]+")
+
+
+def normalize(text: str) -> str:
+    """ניקוד, אותיות סופיות, פיסוק ('/', '–' וכו') ורישיות -> צורה אחידה להשוואה."""
+    text = _NIQQUD.sub("", text).translate(_FINALS).casefold()
+    return _PUNCT.sub(" ", text).strip()
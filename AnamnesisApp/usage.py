@@ -0,0 +1,106 @@
+"""אינדקס הפוך: בדיקה/הדמיה/score/בדיקה גופנית -> התלונות שמשתמשות בה.
+
+    from usage import get_usage
+    get_usage(get_content()).complaints_using("טרופונין")   # ('יתר לחץ דם', 'כאב בחזה', ...)
+
+נבנה פעם אחת לכל גרסת תוכן ושפה; כל שאילתה היא חיפוש במילון אחרי נרמול.
+מונח = ה-key המלא, כל חלק בשם (מפוצל לפי ',' '+' '/') וכל מילה בת 3+ אותיות,
+כך ש-"טרופונין" מוצא גם "טרופונין סדרתי" ו-"CRP" מוצא גם "CBC, CRP". בשפה
+אחרת התוויות מתורגמות והמונחים נלקחים גם מהתרגום וגם מהמקור.
+"""
+from __future__ import annotations
+from typing import Dict, List, Tuple
+import re
+import threading
+
+from rapidfuzz import process
+
+from knowledge import Content
+from locales import SOURCE_LOCALE, Locale
+from records import ITEM_TYPES, Item, title
+from textnorm import normalize
+
+_PARTS = re.compile(r"[,+/]")
+
+KIND_TITLES = {"exam": "🧍‍♂️ בדיקה גופנית", "lab": "🧪 מעבדה", "imaging": "🖥️ הדמיה", "score": "📊 Score"}
+
+
+def _terms(item: Item, loc: Locale = SOURCE_LOCALE) -> List[str]:
+    text = title(item)
+    terms = {item.key.split(":", 1)[1]}
+    for part in (*_PARTS.split(text), *_PARTS.split(loc.t(text))):
+        norm = normalize(part)
+        if norm:
+            terms.add(norm)
+            terms.update(w for w in norm.split() if len(w) >= 3)
+    return [t for t in terms if t]
+
+
+class UsageIndex:
+    __slots__ = ("version", "_by_key", "_labels", "_term_keys", "_term_complaints", "_terms")
+
+    def __init__(self, content: Content, loc: Locale = SOURCE_LOCALE) -> None:
+        self.version = (content.version, loc.key)
+        by_key: Dict[str, List[str]] = {}
+        labels: Dict[str, str] = {}
+        term_keys: Dict[str, set] = {}
+        for name in content.names:
+            blk = content.complaints[name]
+            for field in ITEM_TYPES:
+                for item in blk.get(field, ()):
+                    users = by_key.setdefault(item.key, [])
+                    if not users or users[-1] != name:
+                        users.append(name)
+                    if item.key not in labels:
+                        labels[item.key] = loc.t(title(item))
+                        for t in _terms(item, loc):
+                            term_keys.setdefault(t, set()).add(item.key)
+        self._by_key: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in by_key.items()}
+        self._labels = labels
+        self._term_keys: Dict[str, Tuple[str, ...]] = {t: tuple(sorted(ks)) for t, ks in term_keys.items()}
+        self._term_complaints: Dict[str, Tuple[str, ...]] = {
+            t: tuple(sorted({c for k in ks for c in self._by_key[k]})) for t, ks in self._term_keys.items()}
+        self._terms: List[str] = list(self._term_keys)
+
+    # ========================= API =========================
+    def complaints_for(self, key: str) -> Tuple[str, ...]:
+        """key של פריט (records: item.key) -> תלונות."""
+        return self._by_key.get(key, ())
+
+    def complaints_using(self, term: str) -> Tuple[str, ...]:
+        """מונח חופשי (אחרי נרמול) -> כל התלונות שמשתמשות בפריט תואם."""
+        return self._term_complaints.get(normalize(term), ())
+
+    def lookup(self, term: str) -> List[Tuple[str, str, Tuple[str, ...]]]:
+        """[(key, תווית, תלונות)] לכל פריט שתואם את המונח."""
+        return [(k, self._labels[k], self._by_key[k]) for k in self._term_keys.get(normalize(term), ())]
+
+    def suggest(self, term: str, limit: int = 5) -> List[str]:
+        """תוויות של פריטים קרובים (לשגיאות הקלדה) - לשימוש כשאין התאמה מדויקת."""
+        q = normalize(term)
+        if not q:
+            return []
+        out: Dict[str, None] = {}
+        for t, _, _ in process.extract(q, self._terms, processor=None, score_cutoff=70, limit=limit):
+            for k in self._term_keys[t]:
+                out.setdefault(self._labels[k])
+        return list(out)[:limit]
+
+    @staticmethod
+    def kind_title(key: str) -> str:
+        return KIND_TITLES.get(key.split(":", 1)[0], "")
+
+
+_lock = threading.Lock()
+_indexes: Dict[str, UsageIndex] = {}           # שפה -> אינדקס; רק שפות שבשימוש
+
+
+def get_usage(content: Content, loc: Locale = SOURCE_LOCALE) -> UsageIndex:
+    version = (content.version, loc.key)
+    idx = _indexes.get(loc.code)
+    if idx is None or idx.version != version:
+        with _lock:
+            idx = _indexes.get(loc.code)
+            if idx is None or idx.version != version:
+                idx = _indexes[loc.code] = UsageIndex(content, loc)
+    return idx
@@ -0,0 +1,192 @@
+"""התאמת labels של בדיקה גופנית לקישורי וידאו (video_links.json).
+
+סדר ההתאמה: מדויק -> אחרי נרמול (textnorm: ניקוד, אותיות סופיות, פיסוק) ->
+עמום (rapidfuzz, מעל VIDEO_CUTOFF) -> חיפוש YouTube. כך "האזנה לריאות - קראקלס"
+ו-"האזנה לריאה (קראקלס)" מקבלים את הקישור של "האזנה לריאות (קראקלס)" בלי
+שורה נוספת ב-video_links.json.
+
+החלטות (חוץ מהתאמה מדויקת) נשמרות ב-video_cache.json יחד עם hash של
+video_links.json, שם ה-scorer והסף; שינוי באחד מהם מאפס את המטמון. ההתאמה רצה פעם אחת
+לגרסת תוכן (ב-knowledge._build / build_knowledge.py), לא בכל ריצה.
+
+    python video_index.py             labels שלא נמצא להם קישור (+ המועמד הקרוב ביותר)
+"""
+from __future__ import annotations
+from typing import Dict, List, Any, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import quote_plus
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+
+from rapidfuzz import fuzz, process
+
+from textnorm import normalize
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(BASE_DIR, "video_cache.json")
+SEARCH_URL = "https://www.youtube.com/results?search_query="
+VIDEO_CUTOFF = 88.0
+SCORER = "cover-v2"          # לשנות כשמשנים את _similarity: מאפס החלטות שמורות
+MATCHER = f"{SCORER}@{VIDEO_CUTOFF:g}"
+
+EXACT, NORMALIZED, FUZZY, SEARCH = "exact", "normalized", "fuzzy", "search"
+
+
+class Resolution(NamedTuple):
+    url: str
+    how: str              # exact / normalized / fuzzy / search
+    match: str            # ה-label ב-video_links.json ("" בחיפוש)
+    score: float
+
+
+def _similarity(a: str, b: str, *, processor: Any = None, score_cutoff: Optional[float] = None) -> float:
+    """a = label הבדיקה, b = label בקובץ הקישורים (שניהם מנורמלים).
+
+    token_set נותן 100 לכל תת-קבוצה, אז הוא תקף רק כשהסרטון מכסה את כל מילות
+    הבדיקה ("האזנה ללב" -> "האזנה ללב (קצב/אוושות)"); בדיקה רחבה יותר ("בדיקת
+    ניסטגמוס והליכה") לא מקבלת סרטון צר יותר. במילה בודדת משווים את המחרוזת כולה.
+    """
+    if " " not in a or " " not in b:
+        return fuzz.ratio(a, b, score_cutoff=score_cutoff)
+    if set(a.split()) <= set(b.split()):
+        return fuzz.token_set_ratio(a, b, score_cutoff=score_cutoff)
+    return fuzz.token_sort_ratio(a, b, score_cutoff=score_cutoff)
+
+
+def map_version(video_map: Mapping[str, List[str]]) -> str:
+    raw = json.dumps(dict(video_map), ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+class VideoIndex:
+    __slots__ = ("version", "_exact", "_norm", "_keys", "_decided", "_dirty", "_lock")
+
+    def __init__(self, video_map: Mapping[str, List[str]], version: str = "") -> None:
+        self.version = version or map_version(video_map)
+        self._exact: Dict[str, str] = {label: urls[0] for label, urls in video_map.items() if urls}
+        self._norm: Dict[str, str] = {}
+        for label in self._exact:
+            self._norm.setdefault(normalize(label), label)
+        self._keys: List[str] = list(self._norm)
+        self._decided: Dict[str, Resolution] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def resolve(self, label: str) -> Resolution:
+        label = label.strip()
+        url = self._exact.get(label)
+        if url is not None:
+            return Resolution(url, EXACT, label, 100.0)
+        r = self._decided.get(label)
+        if r is None:
+            r = self._match(label)
+            with self._lock:
+                self._decided[label] = r
+                self._dirty = True
+        return r
+
+    def _match(self, label: str) -> Resolution:
+        q = normalize(label)
+        hit = self._norm.get(q)
+        if hit is not None:
+            return Resolution(self._exact[hit], NORMALIZED, hit, 100.0)
+        best = process.extractOne(q, self._keys, scorer=_similarity, score_cutoff=VIDEO_CUTOFF) if q else None
+        if best is not None:
+            hit = self._norm[best[0]]
+            return Resolution(self._exact[hit], FUZZY, hit, round(best[1], 1))
+        return Resolution(SEARCH_URL + quote_plus(label), SEARCH, "", 0.0)
+
+    def nearest(self, label: str) -> Tuple[str, float]:
+        """המועמד הקרוב ביותר גם מתחת לסף (לכלי ה-unresolved)."""
+        best = process.extractOne(normalize(label), self._keys, scorer=_similarity)
+        return (self._norm[best[0]], round(best[1], 1)) if best else ("", 0.0)
+
+    # ========================= מטמון בדיסק =========================
+    def load(self, path: str = CACHE_PATH) -> None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if data.get("map") != self.version or data.get("matcher") != MATCHER:
+            return                                    # קובץ הקישורים / אופן ההתאמה השתנה: החלטות ישנות לא תקפות
+        with self._lock:
+            for label, r in data.get("labels", {}).items():
+                self._decided.setdefault(label, Resolution(*r))
+
+    def save(self, path: str = CACHE_PATH) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"map": self.version, "matcher": MATCHER, "labels": {k: list(r) for k, r in sorted(self._decided.items())}}
+            self._dirty = False
+        tmp = path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=0)
+            os.replace(tmp, path)
+        except OSError:                               # תיקייה לקריאה בלבד: המטמון רק בזיכרון
+            pass
+
+    def decisions(self) -> Dict[str, Resolution]:
+        return dict(self._decided)
+
+
+_lock = threading.Lock()
+_index: Optional[VideoIndex] = None
+
+
+def get_index(video_map: Mapping[str, List[str]]) -> VideoIndex:
+    """אינדקס ל-video_map הנוכחי (נבנה ונטען מהמטמון פעם אחת לכל גרסה של הקובץ)."""
+    global _index
+    version = map_version(video_map)
+    idx = _index
+    if idx is None or idx.version != version:
+        with _lock:
+            if _index is None or _index.version != version:
+                _index = VideoIndex(video_map, version)
+                _index.load()
+            idx = _index
+    return idx
+
+
+# ========================= CLI: labels ללא קישור =========================
+def unresolved(complaints: Mapping[str, Mapping[str, Any]], index: VideoIndex) -> Dict[str, List[str]]:
+    """label -> תלונות, לכל label שנפל לחיפוש YouTube."""
+    out: Dict[str, List[str]] = {}
+    for name, blk in complaints.items():
+        for it in blk.get("physical_exam", []):
+            label = (it.get("label") or "").strip() if isinstance(it, dict) else ""
+            if label and not it.get("url") and index.resolve(label).how == SEARCH:
+                out.setdefault(label, []).append(name)
+    return out
+
+
+def main(argv: List[str] | None = None) -> int:
+    from knowledge import KNOWLEDGE_PATH, VIDEO_LINKS_PATH
+    ap = argparse.ArgumentParser(description="labels של בדיקה גופנית ללא קישור וידאו")
+    ap.add_argument("--knowledge", default=KNOWLEDGE_PATH)
+    ap.add_argument("--videos", default=VIDEO_LINKS_PATH)
+    ap.add_argument("--all", action="store_true", help="גם התאמות מנורמלות/עמומות")
+    args = ap.parse_args(argv)
+    with open(args.knowledge, encoding="utf-8") as f:
+        complaints = json.load(f)
+    with open(args.videos, encoding="utf-8") as f:
+        index = VideoIndex(json.load(f))
+    missing = unresolved(complaints, index)
+    if args.all:
+        for label, r in sorted(index.decisions().items()):
+            if r.how != SEARCH:
+                print(f"{r.how:10} {r.score:5.1f}  {label}  ->  {r.match}")
+    for label, users in sorted(missing.items()):
+        near, score = index.nearest(label)
+        print(f"{label}\t({' · '.join(users)})\tהכי קרוב: {near} ({score:g})")
+    print(f"{len(missing)} labels ללא קישור", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())